@@ -0,0 +1,204 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from artifacts import read_table
+from canonical_roles import minhash_signatures
+from role_index import build_role_index
+from scoring import SCORING_MODES, encode_employees, top_k_indices
+
+# =========================
+# Approximate role retrieval (MinHash + LSH) for very large role catalogs
+# =========================
+# Each role's skill set gets a MinHash signature of bands * rows_per_band
+# hashes; every band is one LSH table. An employee's candidate roles are the
+# roles sharing a bucket with it in any band (roles whose skill sets are
+# Jaccard-similar to the employee's). Only the candidates are scored, with
+# the exact MatchScorer, so every returned match_score is exact; a role is
+# only missed when it never collides with the employee.
+#
+# Recall vs latency: a role with Jaccard similarity s is retrieved with
+# probability 1 - (1 - s**rows_per_band)**bands. More bands = more
+# candidates = higher recall and more scoring work; more rows per band =
+# smaller buckets = faster, but low-similarity matches are missed.
+#
+#   python ann_index.py --bands 8 16 32 64 --sample 500   (in a generated dataset directory)
+
+ANN_BANDS = 32
+ANN_ROWS_PER_BAND = 1
+
+
+def _without_columns(matrix, cols):
+    # Skills every role carries (the appended "Python") would put every
+    # role in the same bucket; they are left out of the signatures
+    if not len(cols):
+        return matrix
+    keep = np.ones(matrix.shape[1])
+    keep[np.asarray(cols, dtype=np.int64)] = 0
+    matrix = (matrix @ sparse.diags(keep)).tocsr()
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _band_keys(signatures, bands, rows_per_band):
+    # (n_rows, bands) uint64 bucket key per band (the band's hashes combined)
+    sig = signatures.astype(np.uint64).reshape(len(signatures), bands, rows_per_band)
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    for j in range(rows_per_band):
+        keys = keys * np.uint64(0x100000001B3) + sig[:, :, j]
+    return keys
+
+
+class RoleLSHIndex:
+    def __init__(self, role_matrix, bands=ANN_BANDS, rows_per_band=ANN_ROWS_PER_BAND, ignore_cols=None, seed=42):
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        self.ignore_cols = list(ignore_cols) if ignore_cols is not None else []
+        self.seed = seed
+        self.n_roles = role_matrix.shape[0]
+
+        signatures = minhash_signatures(_without_columns(role_matrix, self.ignore_cols), bands * rows_per_band, seed)
+        keys = _band_keys(signatures, bands, rows_per_band)
+        has_skills = np.flatnonzero(signatures[:, 0] >= 0)
+        # Per band: role rows sorted by bucket key, for searchsorted lookups
+        self.band_roles = []
+        self.band_keys = []
+        for band in range(bands):
+            order = has_skills[np.argsort(keys[has_skills, band], kind="stable")]
+            self.band_roles.append(order.astype(np.int32))
+            self.band_keys.append(keys[order, band])
+
+    def candidates(self, emp_chunk):
+        # (employee row, role row) candidate pairs for the chunk, unique and
+        # sorted by employee then role
+        signatures = minhash_signatures(_without_columns(emp_chunk, self.ignore_cols),
+                                        self.bands * self.rows_per_band, self.seed)
+        keys = _band_keys(signatures, self.bands, self.rows_per_band)
+        has_skills = signatures[:, 0] >= 0
+        pairs = []
+        for band in range(self.bands):
+            lo = np.searchsorted(self.band_keys[band], keys[:, band], "left")
+            hi = np.searchsorted(self.band_keys[band], keys[:, band], "right")
+            sizes = np.where(has_skills, hi - lo, 0)
+            # Concatenated ranges lo[i]..hi[i]-1 of every employee's bucket
+            emp_rows = np.repeat(np.arange(len(sizes)), sizes)
+            offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            roles = self.band_roles[band][np.repeat(lo, sizes) + offsets]
+            pairs.append(emp_rows.astype(np.int64) * self.n_roles + roles)
+        pairs = np.unique(np.concatenate(pairs)) if pairs else np.empty(0, dtype=np.int64)
+        return pairs // self.n_roles, pairs % self.n_roles
+
+    def top_k(self, emp_chunk, scorer, k, tie_rank, selector=None):
+        # Best k postings per employee among the candidates, rescored exactly:
+        # (employees x k) posting indices and int32 scores. scorer / the
+        # candidates are over this index's role rows; with a
+        # canonical_roles selector those are canonical roles, expanded to
+        # their member postings. Fewer than k scoring candidates are padded
+        # with zero-score postings in tie order, as RoleIndex does.
+        n_emp, n_postings = emp_chunk.shape[0], len(tie_rank)
+        k = min(k, n_postings)
+        emp_rows, rows = self.candidates(emp_chunk)
+        scores = scorer.pair_scores(emp_chunk, emp_rows, rows)
+        hit = scores > 0
+        emp_rows, rows, scores = emp_rows[hit], rows[hit], scores[hit]
+        if selector is not None:
+            members = selector.first_members[rows]
+            emp_rows = np.repeat(emp_rows, members.shape[1])
+            scores = np.repeat(scores, members.shape[1])
+            rows = members.ravel()
+            keep = rows >= 0
+            emp_rows, rows, scores = emp_rows[keep], rows[keep], scores[keep]
+
+        # Best first within each employee, then the first k of each
+        order = np.lexsort((tie_rank[rows], -scores.astype(np.int64), emp_rows))
+        emp_rows, rows, scores = emp_rows[order], rows[order], scores[order]
+        counts = np.bincount(emp_rows, minlength=n_emp)
+        rank = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        keep = rank < k
+        top = np.full((n_emp, k), -1, dtype=np.int64)
+        top_scores = np.zeros((n_emp, k), dtype=np.int32)
+        top[emp_rows[keep], rank[keep]] = rows[keep]
+        top_scores[emp_rows[keep], rank[keep]] = scores[keep]
+
+        short = np.flatnonzero(counts < k)
+        if len(short):
+            tie_order = np.argsort(tie_rank)
+            for i in short:
+                n = counts[i]
+                top[i, n:] = tie_order[~np.isin(tie_order, top[i, :n])][:k - n]
+        return top, top_scores
+
+
+def evaluate(emp_matrix, role_matrix, scorer, retriever, k=5, tie_rank=None, chunk_size=256):
+    # ANN top-k vs the exact ranking over the same employees:
+    #   recall_at_k  - share of the exact top-k roles the ANN top-k contains
+    #   score_recall - share of ranks where the ANN score equals the exact
+    #                  score (ties make several top-k lists equally correct)
+    n_roles = role_matrix.shape[0]
+    tie_rank = np.arange(n_roles) if tie_rank is None else tie_rank
+    exact_seconds = ann_seconds = 0.0
+    found = same_score = n_candidates = 0
+    for start in range(0, emp_matrix.shape[0], chunk_size):
+        emp_chunk = emp_matrix[start:start + chunk_size]
+        t = time.perf_counter()
+        scores = scorer.scores(emp_chunk)
+        exact_top = top_k_indices(scores, k, tie_rank)
+        exact_seconds += time.perf_counter() - t
+
+        t = time.perf_counter()
+        ann_top, ann_scores = retriever.top_k(emp_chunk, scorer, k, tie_rank)
+        ann_seconds += time.perf_counter() - t
+
+        n_candidates += len(retriever.candidates(emp_chunk)[0])
+        exact_scores = np.take_along_axis(scores, exact_top, axis=1)
+        same_score += np.count_nonzero(exact_scores == ann_scores)
+        for exact_row, ann_row in zip(exact_top, ann_top):
+            found += len(np.intersect1d(exact_row, ann_row))
+    n_emp = max(emp_matrix.shape[0], 1)
+    n_ranks = n_emp * min(k, n_roles)
+    return {
+        'bands': retriever.bands,
+        'rows_per_band': retriever.rows_per_band,
+        'recall_at_k': round(found / max(n_ranks, 1), 4),
+        'score_recall': round(same_score / max(n_ranks, 1), 4),
+        'candidates_per_employee': round(n_candidates / n_emp, 1),
+        'candidate_share': round(n_candidates / n_emp / max(n_roles, 1), 4),
+        'exact_ms_per_employee': round(1000 * exact_seconds / n_emp, 3),
+        'ann_ms_per_employee': round(1000 * ann_seconds / n_emp, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall / latency of ANN role retrieval against exact top-k scoring.")
+    parser.add_argument("--bands", type=int, nargs="+", default=[8, 16, ANN_BANDS, 64])
+    parser.add_argument("--rows-per-band", type=int, default=ANN_ROWS_PER_BAND)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--scoring", default="count", choices=SCORING_MODES)
+    parser.add_argument("--sample", type=int, default=500, help="employees evaluated")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    skills = read_table("Skills")
+    role_index = build_role_index(read_table("Roles"), skills)
+    employee_skills = read_table("EmployeeSkills")
+    employee_ids = pd.unique(employee_skills['employee_id'].astype(str))
+    employee_ids = np.random.default_rng(args.seed).permutation(employee_ids)[:args.sample]
+    emp_matrix = encode_employees(employee_ids, employee_skills.assign(employee_id=employee_skills['employee_id'].astype(str)),
+                                  role_index.skill_id_to_col)
+    scorer = role_index.scorer(args.scoring)
+
+    results = []
+    for bands in args.bands:
+        start = time.perf_counter()
+        retriever = RoleLSHIndex(role_index.role_matrix, bands, args.rows_per_band, role_index.ignore_cols, args.seed)
+        build_seconds = time.perf_counter() - start
+        results.append({**evaluate(emp_matrix, role_index.role_matrix, scorer, retriever, args.k, role_index.tie_rank),
+                        'build_seconds': round(build_seconds, 2)})
+    print(f"ANN vs exact top-{args.k} ({len(employee_ids)} employees, {role_index.n_roles} roles, {args.scoring} scoring):")
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
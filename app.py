@@ -1,8 +1,22 @@
+import io
+import os
+import json
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pdfplumber
+from artifacts import read_table, with_skill_strings, dataset_version
+from role_index import build_role_index
+from lookup import DatasetLookup
+from charts import score_histogram, score_kde
+from instrumentation import Profiler
+from scoring import SCORING_MODES
+from incremental import MANIFEST_PATH
+from batch_scoring import BatchScorer, is_roster, score_roster_csv, ROSTER_ID_COLUMN, ROSTER_SKILLS_COLUMN
+from exports import select_rows, export_bytes, EXPORT_FORMATS, EXPORT_MIME_TYPES
+from service import RecommendationClient, RemoteBatchScorer, ServiceError, SERVICE_URL_ENV, SERVICE_ROSTER_ROWS, RESULT_COLUMNS
+from uploads import UploadCache, content_hash, parse_csv, parse_pdf, MAX_UPLOAD_MB, MAX_PDF_PAGES, PAGES_PER_TASK
 
 # =========================
 # Page Title & Configuration
@@ -11,20 +25,143 @@ st.set_page_config(page_title="Employee Role Recommendation System", layout="wid
 st.title("💡 AI-powered Employee Role Recommendation System")
 st.write("Upload your data and explore recommendations, skill gaps, and match scores.")
 
+# Per-rerun timings of each section below (see instrumentation.py). Records go
+# to the "profile" logger, to PROFILE_LOG as JSON Lines if set, and to the
+# sidebar debug panel at the bottom of this script.
+PROFILE_LOG = None
+profiler = Profiler("app", PROFILE_LOG)
+
 # =========================
 # Load Data
 # =========================
-@st.cache_data
-def load_data():
-    # Assuming these CSVs exist in the execution environment
-    employees = pd.read_csv("Employees.csv")
-    roles = pd.read_csv("Roles.csv")
-    recommendations = pd.read_csv("Recommendations.csv")
-    employee_skills = pd.read_csv("EmployeeSkills.csv")
-    skills = pd.read_csv("Skills.csv")
+profiler.checkpoint("load_data")
+# cache_resource (not cache_data) hands every session the same frames instead of
+# an unpickled copy per rerun; with .arrow artifacts those frames are backed by
+# memory-mapped files shared across worker processes. The dataset version
+# (artifact mtimes) is the cache key, so regenerated files are picked up.
+TABLES = ["Employees", "Roles", "Recommendations", "EmployeeSkills", "Skills"]
+
+@st.cache_resource
+def load_data(version):
+    # Assuming these artifacts (.csv or .arrow) exist in the execution environment
+    employees = read_table("Employees")
+    roles = read_table("Roles")
+    recommendations = read_table("Recommendations")
+    employee_skills = read_table("EmployeeSkills")
+    skills = read_table("Skills")
     return employees, roles, recommendations, employee_skills, skills
 
-employees_df, roles_df, recommendations_df, employee_skills_df, skills_df = load_data()
+data_version = dataset_version(TABLES)
+employees_df, roles_df, recommendations_df, employee_skills_df, skills_df = load_data(data_version)
+
+# Per-employee / per-role indexes, built once per dataset version
+@st.cache_resource
+def load_lookup(version):
+    return DatasetLookup(*load_data(version))
+
+lookup = load_lookup(data_version)
+
+# Global match score histogram + KDE curve, computed once per dataset version
+@st.cache_data
+def load_score_distribution(version):
+    scores = load_data(version)[2]['match_score'].to_numpy()
+    counts, edges = score_histogram(scores, bins=20)
+    kde_x, kde_y = score_kde(scores, edges)
+    return counts, edges, kde_x, kde_y
+
+# Shared recommendation service (service.py). When RECOMMENDATION_SERVICE_URL
+# is set and the service has this dataset version loaded, top-K queries go to
+# its warm copy of the data instead of this process's own role index. The
+# check is repeated every SERVICE_CHECK_SECONDS, so a restarted service is picked up.
+SERVICE_URL = os.environ.get(SERVICE_URL_ENV)
+SERVICE_CHECK_SECONDS = 30
+
+@st.cache_data(ttl=SERVICE_CHECK_SECONDS)
+def service_available(url, version):
+    if not url:
+        return False
+    try:
+        health = RecommendationClient(url, timeout=2).health()
+    except (OSError, ServiceError):
+        return False
+    # JSON round trip: the version tuple comes back as nested lists
+    return health['on_demand_scoring'] and health['version'] == json.loads(json.dumps(version))
+
+service = None
+if service_available(SERVICE_URL, data_version):
+    # One keep-alive connection per session (http.client is not thread-safe)
+    if 'service_client' not in st.session_state:
+        st.session_state['service_client'] = RecommendationClient(SERVICE_URL)
+    service = st.session_state['service_client']
+
+# Inverted skill -> role index for on-demand scoring, built once per server process
+@st.cache_resource
+def load_role_index(version):
+    # Needs the source job_skills.csv; on-demand scoring is disabled without it
+    if not os.path.exists("job_skills.csv"):
+        return None
+    _, roles, _, _, skills = load_data(version)
+    return build_role_index(roles, skills, "job_skills.csv")
+
+role_index = load_role_index(data_version) if service is None else None
+on_demand_scoring = service is not None or role_index is not None
+
+def service_failed():
+    # The service went away after its last health check: answer from this
+    # process's own data and check the service again on the next rerun
+    global service, role_index
+    service_available.clear()
+    st.session_state.pop('service_client', None)
+    service = None
+    role_index = load_role_index(data_version)
+
+def top_roles_for_skills(skill_ids, scoring):
+    if service is not None:
+        try:
+            return service.top_roles(skill_ids=skill_ids, k=5, scoring=scoring)
+        except (OSError, ServiceError):
+            service_failed()
+    if role_index is None:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return role_index.top_roles(skill_ids, k=5, scoring=scoring)
+
+# Scoring mode Recommendations were generated with (genratedata.py SCORING)
+@st.cache_data
+def load_generated_scoring(version):
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)['config'].get('scoring', "count")
+    except (FileNotFoundError, KeyError, ValueError):
+        return "count"
+
+generated_scoring = load_generated_scoring(data_version)
+
+# Parsed uploads by content hash, shared across reruns and sessions
+@st.cache_resource
+def load_upload_cache():
+    return UploadCache()
+
+upload_cache = load_upload_cache()
+
+# Skills mentioned in an upload, per upload content and dataset version
+@st.cache_data
+def find_upload_skills(digest, version, _text):
+    return lookup.vocabulary.ids_in_text(_text)
+
+# Batch scorer for uploaded rosters, per dataset version and scoring mode
+@st.cache_resource
+def load_batch_scorer(version, scoring):
+    return BatchScorer(load_role_index(version), scoring, top_k=5)
+
+# Top-5 roles for every employee of an uploaded roster, as CSV bytes
+@st.cache_data
+def score_uploaded_roster(digest, version, scoring, _roster_df):
+    return score_roster_csv(load_batch_scorer(version, scoring), _roster_df)
+
+# Same, scored by the shared service (no role index in this process)
+@st.cache_data
+def score_roster_on_service(digest, version, scoring, _client, _roster_df):
+    return score_roster_csv(RemoteBatchScorer(_client, scoring, top_k=5), _roster_df, SERVICE_ROSTER_ROWS)
 
 # Helper for CSV download
 @st.cache_data
@@ -34,20 +171,20 @@ def convert_df_to_csv(df):
 # =========================
 # Sidebar Filters & Employee Profile
 # =========================
+profiler.checkpoint("sidebar")
 st.sidebar.header("🔎 Filter Employee")
 emp_list = employees_df['employee_id'].tolist()
 selected_emp = st.sidebar.selectbox("Select Employee", emp_list)
 
 st.sidebar.subheader("👤 Employee Profile")
-emp_data = employees_df[employees_df['employee_id'] == selected_emp].iloc[0]
+emp_data = lookup.employee(selected_emp)
 
 st.sidebar.markdown(f"**Employee ID:** `{emp_data['employee_id']}`")
 st.sidebar.write(f"**Original EmpID:** {emp_data['original_emp_id']}")
 st.sidebar.write(f"**Current Role:** {emp_data['current_role']}")
 
 # Show employee skills
-emp_skills_ids = employee_skills_df[employee_skills_df['employee_id'] == selected_emp]['skill_id'].tolist()
-emp_skills = skills_df[skills_df['skill_id'].isin(emp_skills_ids)]['skill_name'].tolist()
+emp_skills = lookup.employee_skill_names(selected_emp)
 
 if emp_skills:
     st.sidebar.write("**Skills:**")
@@ -56,45 +193,144 @@ else:
     st.sidebar.write("No skills assigned.")
 
 # Default recommendations for the selected employee
-emp_recs = recommendations_df[recommendations_df['employee_id'] == selected_emp].sort_values(
-    by="match_score", ascending=False).head(5)
+emp_recs = None
+if service is not None:
+    try:
+        emp_recs = service.top_roles(employee_id=selected_emp, k=5)
+    except (OSError, ServiceError):
+        service_failed()
+if emp_recs is None:
+    emp_recs = lookup.top_recommendations(selected_emp, k=5)
+    emp_recs = with_skill_strings(emp_recs, lookup.vocabulary)
+
+# What-if: switch the scoring mode or edit the employee's skills, and rescore
+# against every role on demand
+scoring = generated_scoring
+if on_demand_scoring:
+    scoring = st.sidebar.selectbox(
+        "Scoring Mode",
+        options=list(SCORING_MODES),
+        index=SCORING_MODES.index(generated_scoring) if generated_scoring in SCORING_MODES else 0,
+        help="count = number of matched skills; coverage / jaccard / idf = normalized 0-1 scores"
+    )
+    edited_skills = st.sidebar.multiselect(
+        "Edit Skills (refreshes recommendations)",
+        options=lookup.vocabulary.names.tolist(),
+        default=emp_skills,
+        key=f"edited_skills_{selected_emp}"
+    )
+    skills_edited = sorted(edited_skills) != sorted(emp_skills)
+    if skills_edited or scoring != generated_scoring:
+        emp_recs = top_roles_for_skills(lookup.vocabulary.ids_for_names(edited_skills), scoring)
+        if skills_edited:
+            st.sidebar.caption("Recommendations recomputed for the edited skill set.")
+        else:
+            st.sidebar.caption(f"Recommendations recomputed with {scoring} scoring.")
 
 # =========================
 # Section 1: Top Recommendations & Custom Upload
 # =========================
+profiler.checkpoint("section1_recommendations")
 st.header(f"📌 Top Role Recommendations for Employee {selected_emp}")
 
-uploaded = st.file_uploader("Upload Custom Recommendations (CSV or PDF)", type=["csv", "pdf"])
+uploaded = st.file_uploader(
+    "Upload Custom Recommendations (CSV or PDF)", type=["csv", "pdf"],
+    help=f"Up to {MAX_UPLOAD_MB} MB; only the first {MAX_PDF_PAGES} pages of a PDF are read."
+)
 
+parsed_upload = None
 if uploaded:
+    upload_bytes = uploaded.getvalue()
+    parsed_upload = upload_cache.get(content_hash(upload_bytes))
     if uploaded.name.endswith(".csv"):
-        df = pd.read_csv(uploaded)
-        st.success("✅ CSV uploaded successfully!")
-        st.dataframe(df.head(20))
+        try:
+            if parsed_upload is None:
+                parsed_upload = parse_csv(uploaded.name, upload_bytes)
+                upload_cache.put(parsed_upload)
+            st.success("✅ CSV uploaded successfully!")
+            st.dataframe(parsed_upload.frame.head(20))
+        except Exception as e:
+            parsed_upload = None
+            st.error(f"Error reading CSV: {e}")
     elif uploaded.name.endswith(".pdf"):
-        pdf_text = ""
-        tables = []
         try:
-            with pdfplumber.open(uploaded) as pdf:
-                for page in pdf.pages:
-                    pdf_text += (page.extract_text() or "") + "\n"
-                    table = page.extract_table()
-                    if table: tables.append(table)
+            if parsed_upload is None:
+                # First time this file is seen: stream pages into the page as they are parsed
+                progress = st.progress(0.0, text="Reading PDF...")
+                preview = st.empty()
+                page_texts = []
+
+                def show_page(parsed, text, table):
+                    page_texts.append(text + "\n")
+                    to_read = min(parsed.n_pages, MAX_PDF_PAGES)
+                    progress.progress(parsed.pages_read / to_read, text=f"Reading PDF... page {parsed.pages_read}/{to_read}")
+                    if parsed.tables and len(parsed.tables) == 1 and table:
+                        preview.dataframe(parsed.first_table().head(20))
+                    elif not parsed.tables and (parsed.pages_read % PAGES_PER_TASK == 0 or parsed.pages_read == to_read):
+                        preview.text("".join(page_texts))
+
+                with profiler.stage("parse_upload_pdf") as stage:
+                    parsed_upload = parse_pdf(uploaded.name, upload_bytes, on_page=show_page)
+                    stage.count(rows=parsed_upload.pages_read)
+                upload_cache.put(parsed_upload)
+                progress.empty()
+                preview.empty()
             st.success("✅ PDF uploaded successfully!")
-            if tables:
-                df = pd.DataFrame(tables[0][1:], columns=tables[0][0])
-                st.dataframe(df.head(20))
+            if parsed_upload.truncated:
+                st.warning(f"⚠️ Only the first {parsed_upload.pages_read} of {parsed_upload.n_pages} pages were read.")
+            if parsed_upload.tables:
+                st.dataframe(parsed_upload.first_table().head(20))
             else:
-                st.text_area("Extracted Text from PDF", pdf_text, height=300)
+                st.text_area("Extracted Text from PDF", parsed_upload.text, height=300)
         except Exception as e:
+            parsed_upload = None
             st.error(f"Error reading PDF: {e}")
 
+# A CSV roster (employee_id + comma-separated skills per row) is scored per
+# employee in batches, like the generator does; anything else is scored as
+# one profile from the skills named in it
+upload_is_roster = parsed_upload is not None and parsed_upload.frame is not None and is_roster(parsed_upload.frame)
+if upload_is_roster and on_demand_scoring:
+    st.subheader(f"Roster Scoring: {len(parsed_upload.frame)} employees")
+    if st.checkbox("Score every employee in the roster (top 5 roles each)", key=f"score_roster_{parsed_upload.digest}"):
+        roster_csv = None
+        if service is not None:
+            try:
+                roster_csv = score_roster_on_service(parsed_upload.digest, data_version, scoring, service, parsed_upload.frame)
+            except (OSError, ServiceError):
+                service_failed()
+        if roster_csv is None and role_index is not None:
+            roster_csv = score_uploaded_roster(parsed_upload.digest, data_version, scoring, parsed_upload.frame)
+        if roster_csv is None:
+            st.warning("⚠️ The recommendation service stopped and job_skills.csv was not found, so the roster could not be scored.")
+        else:
+            st.dataframe(pd.read_csv(io.BytesIO(roster_csv), nrows=20))
+            st.download_button(
+                "Download Roster Recommendations (CSV)",
+                data=roster_csv,
+                file_name=f"{os.path.splitext(parsed_upload.name)[0]}_Recommendations.csv",
+                mime="text/csv"
+            )
+    else:
+        st.caption(f"Columns '{ROSTER_ID_COLUMN}' and '{ROSTER_SKILLS_COLUMN}' found: this upload can be scored as a roster.")
+elif parsed_upload is not None and on_demand_scoring:
+    upload_skill_ids = find_upload_skills(parsed_upload.digest, data_version, parsed_upload.text)
+    if upload_skill_ids:
+        st.subheader(f"Top 5 Roles for {parsed_upload.name}")
+        st.caption("Skills found: " + ", ".join(lookup.vocabulary.decode([upload_skill_ids])))
+        st.dataframe(top_roles_for_skills(upload_skill_ids, scoring)[
+            ['role_id', 'match_score', 'matched_skills', 'missing_skills']
+        ])
+    else:
+        st.info("No known skills were found in the upload, so it could not be scored.")
+
 st.subheader("Top 5 Recommended Roles")
 st.dataframe(emp_recs[['role_id', 'match_score', 'matched_skills', 'missing_skills']])
 
 # =========================
 # Section 2: Skill Gap Analysis (Enhanced with Bar Chart)
 # =========================
+profiler.checkpoint("section2_skill_gap")
 st.header("🎯 Skill Gap Analysis")
 
 if not emp_recs.empty:
@@ -122,10 +358,10 @@ if not emp_recs.empty:
     
     if n_total > 0:
         # --- Create Eye-Catching Bar Chart ---
-        role_name = roles_df[roles_df['role_id'] == top_rec['role_id']]['role_name'].iloc[0] if not roles_df[roles_df['role_id'] == top_rec['role_id']].empty else top_rec['role_id']
+        role_name = lookup.role_name(top_rec['role_id'], default=top_rec['role_id'])
         
         st.subheader(f"Required Skills Breakdown for Role: {role_name}")
-        st.markdown(f"**Match Score:** `{top_rec['match_score']:.2f}` (Total Required Skills: **{n_total}**)")
+        st.markdown(f"**Match Score ({scoring}):** `{top_rec['match_score']:.2f}` (Total Required Skills: **{n_total}**)")
 
         fig, ax = plt.subplots(figsize=(10, 2.5))
         
@@ -146,6 +382,7 @@ if not emp_recs.empty:
         ax.legend(loc='lower center', bbox_to_anchor=(0.5, -0.4), ncol=2, frameon=False)
         
         st.pyplot(fig)
+        plt.close(fig)
         
         # Display skills in two columns
         col1, col2 = st.columns(2)
@@ -169,19 +406,27 @@ if not emp_recs.empty:
 # =========================
 # Section 3: Match Score Distribution (Enhanced)
 # =========================
+profiler.checkpoint("section3_score_distribution")
 st.header("📊 Match Score Distribution (Overall & Employee Context)")
 
 fig, ax = plt.subplots(figsize=(10, 5))
 
-# Plot overall distribution
-sns.histplot(recommendations_df['match_score'], bins=20, kde=True, ax=ax, color='#2196F3', edgecolor='black', alpha=0.6)
-
-# Highlight the current employee's scores with vertical lines
-emp_scores = emp_recs['match_score'].tolist()
-for score in emp_scores:
-    ax.axvline(score, color='#FF5722', linestyle='--', linewidth=2) # Orange highlight
-
-ax.set_xlabel("Match Score", fontsize=12)
+# Plot overall distribution (precomputed bins + KDE, drawn like sns.histplot(..., kde=True))
+counts, edges, kde_x, kde_y = load_score_distribution(data_version)
+ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='#2196F3', edgecolor='black', alpha=0.6)
+if kde_x is not None:
+    ax.plot(kde_x, kde_y, color='#2196F3')
+
+# Highlight the current employee's scores with vertical lines; the overall
+# distribution is in the generated scoring mode, so scores recomputed in
+# another mode are not comparable and are left out
+show_emp_scores = scoring == generated_scoring
+if show_emp_scores:
+    emp_scores = emp_recs['match_score'].tolist()
+    for score in emp_scores:
+        ax.axvline(score, color='#FF5722', linestyle='--', linewidth=2) # Orange highlight
+
+ax.set_xlabel(f"Match Score ({generated_scoring})", fontsize=12)
 ax.set_ylabel("Number of Employee-Role Pairs", fontsize=12)
 ax.set_title("Distribution of Match Scores Across All Pairs (Employee Scores Highlighted)", fontsize=14)
 
@@ -190,29 +435,26 @@ legend_elements = [
     plt.Line2D([0], [0], color='#2196F3', lw=4, label='Overall Distribution', alpha=0.6),
     plt.Line2D([0], [0], color='#FF5722', linestyle='--', lw=2, label=f'{selected_emp} Top Scores')
 ]
-ax.legend(handles=legend_elements)
+ax.legend(handles=legend_elements if show_emp_scores else legend_elements[:1])
 
 st.pyplot(fig)
+plt.close(fig)
+if not show_emp_scores:
+    st.caption(f"{selected_emp}'s scores are not highlighted: they were recomputed with {scoring} scoring, "
+               f"the distribution uses {generated_scoring} scoring.")
 
 # =========================
 # Section 4: Employee-Skill Matrix (Interactive - High Contrast)
 # =========================
+profiler.checkpoint("section4_skill_matrix")
 st.header("✨ Employee-Skill Matrix (Interactive - High Contrast)")
 
 # --- Prepare data for heatmap ---
-skill_map = skills_df.set_index('skill_id')['skill_name'].to_dict()
-all_skill_names = sorted(skill_map.values())
+# The employee x skill matrix is kept sparse in the cached lookup; only the
+# selected employees / skills are densified below
+all_skill_names = sorted(skills_df.drop_duplicates('skill_id')['skill_name'])
 all_employee_ids = employees_df['employee_id'].tolist()
 
-pivot_df = employee_skills_df.pivot_table(
-    index='employee_id',
-    columns='skill_id',
-    aggfunc='size',
-    fill_value=0
-)
-pivot_df.columns = pivot_df.columns.map(lambda x: skill_map.get(x, x))
-pivot_df = pivot_df.fillna(0) 
-
 # --- Interactive Filters ---
 col_heatmap_1, col_heatmap_2 = st.columns(2)
 
@@ -235,15 +477,11 @@ with col_heatmap_2:
 # --- Apply Filters ---
 if selected_employees and selected_skills:
     
-    # Filter by selected employees
-    pivot_df_filtered = pivot_df.loc[pivot_df.index.intersection(selected_employees)]
-    
-    # Filter by selected skills
-    skill_cols_to_use = [s for s in selected_skills if s in pivot_df_filtered.columns]
+    # Densify only the selected employees x selected skills
+    pivot_df_filtered = lookup.skill_matrix_frame(selected_employees, selected_skills)
+    skill_cols_to_use = pivot_df_filtered.columns.tolist()
     
     if skill_cols_to_use:
-        pivot_df_filtered = pivot_df_filtered[skill_cols_to_use]
-        
         # --- Generate Eye-Catching Heatmap ---
         fig_width = max(8, len(skill_cols_to_use) * 1.5)
         fig_height = max(5, len(selected_employees) * 0.5)
@@ -272,6 +510,7 @@ if selected_employees and selected_skills:
         plt.xticks(rotation=45, ha='right')
         plt.tight_layout()
         st.pyplot(plt.gcf())
+        plt.close(plt.gcf())
     else:
         st.warning("Please select at least one valid skill to generate the heatmap.")
 else:
@@ -281,15 +520,33 @@ else:
 # =========================
 # Section 5: Download Recommendations
 # =========================
+profiler.checkpoint("section5_downloads")
 st.header("⬇️ Download Data")
 
-recs_csv = convert_df_to_csv(recommendations_df)
+# The full table is only written when the button is clicked (data is a
+# callable), chunk by chunk and compressed, for just the selected slice
+col_export_1, col_export_2, col_export_3 = st.columns(3)
+with col_export_1:
+    export_employees = st.multiselect("Only these employees (empty = all):", options=all_employee_ids)
+with col_export_2:
+    export_min_score = st.number_input("Minimum match score:", min_value=0.0, value=0.0)
+with col_export_3:
+    export_format = st.radio(
+        "Format:", EXPORT_FORMATS, horizontal=True,
+        format_func=lambda fmt: {"csv.gz": "CSV (gzip)", "parquet": "Parquet"}[fmt]
+    )
+
+def export_recommendations():
+    rows = select_rows(recommendations_df, export_employees, export_min_score or None)
+    return export_bytes(recommendations_df, export_format, rows, lookup.vocabulary)
 
 st.download_button(
-    "Download All Recommendations Data (CSV)",
-    data=recs_csv,
-    file_name="All_Recommendations_Data.csv",
-    mime="text/csv"
+    "Download All Recommendations Data" if not export_employees and not export_min_score
+    else "Download Selected Recommendations Data",
+    data=export_recommendations,
+    file_name=f"All_Recommendations_Data.{export_format}",
+    mime=EXPORT_MIME_TYPES[export_format],
+    on_click="ignore"
 )
 st.download_button(
     f"Download {selected_emp}'s Top Recommendations (CSV)",
@@ -297,3 +554,13 @@ st.download_button(
     file_name=f"{selected_emp}_Top_Recommendations.csv",
     mime="text/csv"
 )
+
+# =========================
+# Debug Panel: per-section render timings
+# =========================
+profiler.finish()
+if st.sidebar.checkbox("🛠️ Show performance debug panel", value=False):
+    st.sidebar.subheader("⏱️ Render Timings (this rerun)")
+    debug_df = profiler.summary()
+    st.sidebar.dataframe(debug_df[['stage', 'seconds', 'rss_mb', 'peak_rss_mb']], hide_index=True)
+    st.sidebar.caption(f"Total: {debug_df['seconds'].sum():.3f}s")
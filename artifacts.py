@@ -0,0 +1,246 @@
+import gzip
+import os
+import shutil
+import pandas as pd
+
+from vocabulary import SkillVocabulary
+
+# =========================
+# Artifact storage for the generated datasets
+# =========================
+# "csv"   -> Skills.csv, Roles.csv, ... (the original format)
+# "arrow" -> Skills.arrow, Roles.arrow, ... uncompressed Arrow IPC files.
+#            They are memory-mapped on load, so every Streamlit worker shares
+#            the same OS pages instead of parsing and holding its own copy.
+#            Repetitive string columns are dictionary-encoded, and the
+#            matched/missing skill lists of Recommendations are stored as
+#            list<int32> skill_id columns instead of comma-joined names.
+ARTIFACT_FORMATS = ("csv", "arrow")
+
+# Low-cardinality string columns stored as Arrow dictionaries (pandas categoricals)
+DICTIONARY_COLUMNS = {
+    "Roles": ["role_name"],
+    "Employees": ["current_role"],
+    "EmployeeSkills": ["employee_id"],
+    "Recommendations": ["employee_id", "role_id"],
+}
+
+SKILL_LIST_COLUMNS = {
+    "matched_skills": "matched_skill_ids",
+    "missing_skills": "missing_skill_ids",
+}
+
+# Formats for frames written as a stream of chunks (exports, batch results)
+STREAM_FORMATS = ("csv", "csv.gz", "parquet")
+GZIP_LEVEL = 6
+
+
+def artifact_path(name, fmt, directory="."):
+    return os.path.join(directory, f"{name}.{fmt}")
+
+
+def partition_dir(name, directory="."):
+    return os.path.join(directory, f"{name}.parts")
+
+
+def partition_path(name, fmt, shard_no, directory="."):
+    return os.path.join(partition_dir(name, directory), f"part-{shard_no:05d}.{fmt}")
+
+
+def reset_partitions(name, directory="."):
+    # Drop partitions of a previous run (its shard count may have differed)
+    shutil.rmtree(partition_dir(name, directory), ignore_errors=True)
+    os.makedirs(partition_dir(name, directory))
+
+
+def write_table(df, name, fmt="csv", directory=".", skills_df=None):
+    _write_frame(df, name, fmt, artifact_path(name, fmt, directory), skills_df)
+
+
+def write_partition(df, name, fmt, shard_no, directory=".", skills_df=None):
+    # One shard's slice of table `name`, combined later by merge_partitions()
+    _write_frame(df, name, fmt, partition_path(name, fmt, shard_no, directory), skills_df)
+
+
+def _write_frame(df, name, fmt, path, skills_df=None):
+    # Recommendations may carry skill id arrays from the scoring step
+    # (scoring.build_recommendations(skill_ids=...)) next to the strings
+    id_cols = [col for col in SKILL_LIST_COLUMNS.values() if col in df.columns]
+    if fmt == "csv":
+        df.drop(columns=id_cols).to_csv(path, index=False)
+        return
+    if fmt != "arrow":
+        raise ValueError(f"❌ Unknown artifact format '{fmt}', expected one of {ARTIFACT_FORMATS}")
+
+    import pyarrow as pa
+
+    df = df.reset_index(drop=True)
+    if name == "Recommendations":
+        df = df.copy()
+        for str_col, id_col in SKILL_LIST_COLUMNS.items():
+            if str_col not in df.columns:
+                continue
+            if id_col not in df.columns:
+                if skills_df is None:
+                    continue
+                df[id_col] = SkillVocabulary.from_frame(skills_df).encode(df[str_col])
+            df = df.drop(columns=str_col)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for col in DICTIONARY_COLUMNS.get(name, []):
+        if col in table.column_names:
+            i = table.column_names.index(col)
+            table = table.set_column(i, col, table.column(col).cast(pa.string()).dictionary_encode())
+    for id_col in SKILL_LIST_COLUMNS.values():
+        if id_col in table.column_names:
+            i = table.column_names.index(id_col)
+            table = table.set_column(i, id_col, table.column(id_col).cast(pa.list_(pa.int32())))
+
+    # Uncompressed, single record batch -> readable straight from a memory map
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table.combine_chunks())
+
+
+def merge_partitions(name, fmt, n_shards, directory="."):
+    # Concatenate partitions 0..n_shards-1 in shard order into the final artifact
+    parts = [partition_path(name, fmt, shard_no, directory) for shard_no in range(n_shards)]
+    out_path = artifact_path(name, fmt, directory)
+    if fmt == "csv":
+        # Byte-level concatenation, keeping only the first header line
+        with open(out_path, "wb") as out:
+            for i, part in enumerate(parts):
+                with open(part, "rb") as f:
+                    if i > 0:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
+        return
+    if fmt != "arrow":
+        raise ValueError(f"❌ Unknown artifact format '{fmt}', expected one of {ARTIFACT_FORMATS}")
+
+    import pyarrow as pa
+
+    # Parts are memory-mapped; unify_dictionaries() gives all batches one shared
+    # dictionary, which the IPC file format requires
+    tables = [pa.ipc.open_file(pa.memory_map(part, "r")).read_all() for part in parts]
+    table = pa.concat_tables(tables).unify_dictionaries()
+    with pa.OSFile(out_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def detect_format(name, directory="."):
+    # Use whichever artifact was written most recently
+    candidates = [fmt for fmt in ARTIFACT_FORMATS if os.path.exists(artifact_path(name, fmt, directory))]
+    if not candidates:
+        raise FileNotFoundError(f"{name}.csv / {name}.arrow not found in '{directory}'. Run genratedata.py first.")
+    return max(candidates, key=lambda fmt: os.path.getmtime(artifact_path(name, fmt, directory)))
+
+
+def dataset_version(names, directory="."):
+    # Changes whenever any of the tables is regenerated; used as a cache key
+    version = []
+    for name in names:
+        fmt = detect_format(name, directory)
+        version.append((name, fmt, os.path.getmtime(artifact_path(name, fmt, directory))))
+    return tuple(version)
+
+
+def read_table(name, fmt=None, directory="."):
+    fmt = fmt or detect_format(name, directory)
+    return _read_frame(artifact_path(name, fmt, directory), fmt)
+
+
+def read_partition(name, fmt, shard_no, directory="."):
+    return _read_frame(partition_path(name, fmt, shard_no, directory), fmt)
+
+
+def _read_frame(path, fmt):
+    if fmt == "csv":
+        return pd.read_csv(path)
+    if fmt != "arrow":
+        raise ValueError(f"❌ Unknown artifact format '{fmt}', expected one of {ARTIFACT_FORMATS}")
+
+    import pyarrow as pa
+
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    # split_blocks avoids consolidating columns into new 2D blocks, so numeric
+    # columns stay views over the mapped file. list<int32> skill id columns
+    # stay Arrow-backed (pd.ArrowDtype) instead of one Python list per row;
+    # with_skill_strings() decodes only the rows it is given
+    return table.to_pandas(split_blocks=True, types_mapper=_arrow_list_dtype)
+
+
+def _arrow_list_dtype(arrow_type):
+    import pyarrow as pa
+
+    return pd.ArrowDtype(arrow_type) if pa.types.is_list(arrow_type) else None
+
+
+def stream_format(path):
+    # "results.csv.gz" -> "csv.gz"
+    for fmt in sorted(STREAM_FORMATS, key=len, reverse=True):
+        if path.lower().endswith("." + fmt):
+            return fmt
+    raise ValueError(f"❌ Unknown output format for '{path}', expected one of {STREAM_FORMATS}")
+
+
+def write_frames(frames, sink, fmt="csv", columns=None):
+    # Writes each frame as it arrives to a path or binary file object, so only
+    # one chunk is in memory at a time; returns the number of rows written.
+    # Without any frame, an empty table with `columns` is written.
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"❌ Unknown output format '{fmt}', expected one of {STREAM_FORMATS}")
+    n_rows = 0
+    if fmt in ("csv", "csv.gz"):
+        raw = open(sink, "wb") if isinstance(sink, str) else sink
+        out = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL) if fmt == "csv.gz" else raw
+        try:
+            header = True
+            for frame in frames:
+                out.write(frame.to_csv(index=False, header=header).encode("utf-8"))
+                header = False
+                n_rows += len(frame)
+            if header:
+                out.write(pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8"))
+        finally:
+            # GzipFile.close() writes the trailer but leaves `raw` open
+            if out is not raw:
+                out.close()
+            if raw is not sink:
+                raw.close()
+        return n_rows
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            n_rows += len(frame)
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=columns), preserve_index=False), sink)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def with_skill_strings(recs_df, vocabulary):
+    # Arrow Recommendations carry skill_id lists; expand them back into the
+    # "matched_skills" / "missing_skills" strings for display using a
+    # vocabulary.SkillVocabulary. Call it on the rows being shown, not on the
+    # whole table. CSV frames pass through.
+    if all(col in recs_df.columns for col in SKILL_LIST_COLUMNS):
+        return recs_df
+    recs_df = recs_df.copy()
+    for str_col, id_col in SKILL_LIST_COLUMNS.items():
+        if id_col in recs_df.columns:
+            recs_df[str_col] = vocabulary.decode(recs_df[id_col])
+            recs_df = recs_df.drop(columns=id_col)
+    return recs_df
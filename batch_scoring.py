@@ -0,0 +1,156 @@
+import argparse
+import io
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from artifacts import read_table, write_frames, stream_format
+from canonical_roles import ROLE_DEDUP_MODES, canonicalize_roles, RoleGroups
+from role_index import build_role_index
+from scoring import SCORING_MODES, TIE_BREAK_MODES, MatchScorer, encode_employees, build_recommendations
+from vocabulary import tokenize
+
+# =========================
+# Batch scoring of employee rosters
+# =========================
+# Scores a roster (one row per employee: an id and a comma-separated skill
+# list) against the roles of an existing generated dataset, without
+# rerunning genratedata.py. The role matrix, scoring weights and canonical
+# role groups are built once (BatchScorer); the roster is read, scored and
+# written chunk by chunk, so memory stays bounded by ROSTER_CHUNK_ROWS
+# employees x TOP_K rows whatever the roster size.
+#
+#   python batch_scoring.py cohort.csv --out cohort_recommendations.parquet --top-k 5
+
+ROSTER_ID_COLUMN = "employee_id"
+ROSTER_SKILLS_COLUMN = "skills"
+ROSTER_CHUNK_ROWS = 10_000
+
+RESULT_COLUMNS = ['employee_id', 'role_id', 'match_score', 'matched_skills', 'missing_skills']
+
+
+def is_roster(df, id_column=ROSTER_ID_COLUMN, skills_column=ROSTER_SKILLS_COLUMN):
+    return id_column in df.columns and skills_column in df.columns
+
+
+def _roster_chunk(df, id_column, skills_column):
+    if not is_roster(df, id_column, skills_column):
+        raise ValueError(f"❌ Roster needs '{id_column}' and '{skills_column}' columns, found {list(df.columns)}")
+    return pd.DataFrame({
+        'employee_id': df[id_column].astype(str).to_numpy(),
+        'skills': df[skills_column].to_numpy(),
+    })
+
+
+def read_roster(path, chunk_rows=ROSTER_CHUNK_ROWS, id_column=ROSTER_ID_COLUMN, skills_column=ROSTER_SKILLS_COLUMN):
+    # Yields (employee_id, skills) frames of at most chunk_rows rows, from a CSV or Parquet file
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=[id_column, skills_column]):
+            yield _roster_chunk(batch.to_pandas(), id_column, skills_column)
+        return
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        yield _roster_chunk(chunk, id_column, skills_column)
+
+
+def split_roster(df, chunk_rows=ROSTER_CHUNK_ROWS, id_column=ROSTER_ID_COLUMN, skills_column=ROSTER_SKILLS_COLUMN):
+    # Same chunks for a roster that is already in memory (e.g. an app upload)
+    for lo in range(0, max(len(df), 1), chunk_rows):
+        yield _roster_chunk(df.iloc[lo:lo + chunk_rows], id_column, skills_column)
+
+
+class BatchScorer:
+    def __init__(self, role_index, scoring="count", top_k=5, tie_break="role_order", role_dedup="exact", seed=42):
+        self.role_index = role_index
+        self.top_k = top_k
+        self.tie_break = tie_break
+        self.seed = seed
+        role_matrix = role_index.role_matrix
+        self.groups = None
+        if role_dedup is not None:
+            canon_of = canonicalize_roles(role_index.role_names, role_matrix, role_dedup, seed=seed)
+            self.groups = RoleGroups(canon_of, role_matrix)
+        self.scorer = MatchScorer(self.groups.role_matrix if self.groups is not None else role_matrix, scoring,
+                                  role_index.ignore_cols, weight_matrix=role_matrix)
+
+    def encode(self, roster_chunk):
+        # Skill names -> binary employee x skill matrix; unknown names are dropped
+        vocabulary = self.role_index.vocabulary
+        tokens = tokenize(roster_chunk['skills'])
+        skill_ids = tokens.map(vocabulary.name_to_id)
+        skill_ids = skill_ids[skill_ids.notna()]
+        employee_skills_df = pd.DataFrame({
+            'employee_id': skill_ids.index.to_numpy(),
+            'skill_id': skill_ids.to_numpy(dtype=np.int64),
+        })
+        return encode_employees(range(len(roster_chunk)), employee_skills_df, vocabulary.id_to_col)
+
+    def score(self, roster_chunk):
+        # Top-K recommendations for one roster chunk, same columns as Recommendations.csv
+        index = self.role_index
+        return build_recommendations(
+            roster_chunk['employee_id'].to_numpy(),
+            index.role_ids,
+            self.encode(roster_chunk),
+            index.role_matrix,
+            index.skill_names,
+            top_k=self.top_k,
+            tie_break=self.tie_break,
+            seed=self.seed,
+            verbose=False,
+            scorer=self.scorer,
+            groups=self.groups
+        )[RESULT_COLUMNS]
+
+    def iter_scores(self, roster_chunks):
+        for roster_chunk in roster_chunks:
+            yield self.score(roster_chunk)
+
+
+def score_roster_csv(batch_scorer, roster_df, chunk_rows=ROSTER_CHUNK_ROWS):
+    # In-memory variant for the app's download button
+    buffer = io.BytesIO()
+    write_frames(batch_scorer.iter_scores(split_roster(roster_df, chunk_rows)), buffer, "csv", RESULT_COLUMNS)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a roster of employees against the generated roles.")
+    parser.add_argument("roster", help="CSV or Parquet file with employee id and comma-separated skills columns")
+    parser.add_argument("--out", required=True, help="results file (.csv, .csv.gz or .parquet)")
+    parser.add_argument("--data-dir", default=".", help="directory with Roles / Skills and job_skills.csv")
+    parser.add_argument("--id-column", default=ROSTER_ID_COLUMN)
+    parser.add_argument("--skills-column", default=ROSTER_SKILLS_COLUMN)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--scoring", default="count", choices=SCORING_MODES)
+    parser.add_argument("--tie-break", default="role_order", choices=TIE_BREAK_MODES)
+    parser.add_argument("--role-dedup", default="exact", type=lambda v: None if v == "none" else v,
+                        choices=ROLE_DEDUP_MODES, help="exact, near or none")
+    parser.add_argument("--chunk-rows", type=int, default=ROSTER_CHUNK_ROWS, help="roster rows scored at a time")
+    args = parser.parse_args()
+
+    fmt = stream_format(args.out)
+    start = time.perf_counter()
+    role_index = build_role_index(
+        read_table("Roles", directory=args.data_dir),
+        read_table("Skills", directory=args.data_dir),
+        os.path.join(args.data_dir, "job_skills.csv"),
+        args.tie_break
+    )
+    batch_scorer = BatchScorer(role_index, args.scoring, args.top_k, args.tie_break, args.role_dedup)
+    print(f"✅ Role index ready: {role_index.n_roles} roles ({time.perf_counter() - start:.1f}s)")
+
+    def report(frames):
+        for done, frame in enumerate(frames, 1):
+            print(f"Scored chunk {done} ({len(frame)} rows)...")
+            yield frame
+
+    chunks = read_roster(args.roster, args.chunk_rows, args.id_column, args.skills_column)
+    n_rows = write_frames(report(batch_scorer.iter_scores(chunks)), args.out, fmt, RESULT_COLUMNS)
+    print(f"✅ {n_rows} recommendations written to {args.out} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import numpy as np
+
+import genratedata
+from synthetic_data import write_source_csvs, add_size_arguments
+from artifacts import read_table
+from lookup import DatasetLookup
+from role_index import build_role_index
+from scoring import SCORING_MODES
+from canonical_roles import ROLE_DEDUP_MODES
+from instrumentation import Profiler, peak_rss_mb
+
+# =========================
+# Pipeline benchmark on synthetic data
+# =========================
+# Generates source CSVs (synthetic_data.py), runs every genratedata.py stage
+# and the app's load / index / query paths in that directory, and records per
+# stage (instrumentation.Profiler, including genratedata's own sub-stages):
+# wall time, rows processed, rows/sec and RSS. Results are saved as JSON; with --baseline, any stage slower than the baseline by
+# more than --tolerance fails the run (exit code 1).
+#
+#   python benchmark.py --roles 50000 --out bench_results.json
+#   python benchmark.py --roles 50000 --baseline bench_results.json
+
+# Slowdowns below this many seconds are treated as noise when comparing
+MIN_REGRESSION_SECONDS = 0.05
+APP_QUERIES = 1000
+
+
+def run_stage(profiler, name, fn, rows=None):
+    # rows: int, or a function of fn's result
+    with profiler.stage(name) as stage:
+        result = fn()
+        n_rows = rows(result) if callable(rows) else rows
+        if n_rows is not None:
+            stage.count(rows=n_rows)
+    record = profiler.records[-1]
+    print(f"  {name:<24} {record['seconds']:8.3f}s  {n_rows or '':>12}  {record['peak_rss_mb']:8.1f} MB")
+    return result
+
+
+def benchmark_pipeline(profiler):
+    g = genratedata
+    skills_df, job_link_to_skill_ids = run_stage(profiler, "ingest_skills", g.create_skills, rows=lambda r: len(r[1]))
+    roles_df = run_stage(profiler, "ingest_roles", g.create_roles, rows=len)
+    employees_df = run_stage(profiler, "employees", g.create_employees, rows=len)
+    employee_skills_df, python_id = run_stage(
+        profiler, "employee_skills", lambda: g.create_employee_skills(employees_df, skills_df), rows=lambda r: len(r[0])
+    )
+    # Steps 5 + 6; rows = employee-role pairs scored
+    run_stage(
+        profiler, "score_and_paths",
+        lambda: g.run_sharded(employees_df, roles_df, skills_df, employee_skills_df, job_link_to_skill_ids, python_id,
+                              profiler=profiler),
+        rows=len(employees_df) * len(roles_df)
+    )
+
+
+def benchmark_app(profiler, seed, scoring):
+    # The app's cached resources, built the way app.py builds them
+    tables = run_stage(
+        profiler, "app_load_tables",
+        lambda: [read_table(name) for name in ["Employees", "Roles", "Recommendations", "EmployeeSkills", "Skills"]],
+        rows=lambda r: len(r[2])
+    )
+    employees, roles, _, employee_skills, skills = tables
+    lookup = run_stage(profiler, "app_lookup_index", lambda: DatasetLookup(*tables), rows=len(employee_skills))
+    role_index = run_stage(profiler, "app_role_index", lambda: build_role_index(roles, skills), rows=len(roles))
+
+    rng = np.random.default_rng(seed)
+    employee_ids = employees['employee_id'].to_numpy()
+    sample = employee_ids[rng.integers(0, len(employee_ids), APP_QUERIES)]
+    run_stage(profiler, "app_top_recommendations", lambda: [lookup.top_recommendations(e, k=5) for e in sample], rows=APP_QUERIES)
+    queries = [lookup.emp_skill_ids[slice(*lookup.emp_skill_offsets.get(e, (0, 0)))] for e in sample]
+    run_stage(profiler, "app_rescore_queries", lambda: [role_index.top_roles(q, k=5, scoring=scoring) for q in queries], rows=APP_QUERIES)
+
+
+def compare(results, baseline, tolerance):
+    # Stages slower than baseline * (1 + tolerance)
+    before = {s['stage']: s['seconds'] for s in baseline['stages']}
+    regressions = []
+    for stage in results['stages']:
+        old = before.get(stage['stage'])
+        if old is None:
+            continue
+        new = stage['seconds']
+        if new > old * (1 + tolerance) and new - old > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{stage['stage']}: {old:.3f}s -> {new:.3f}s ({new / old - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark genratedata.py and the app's data paths on synthetic data.")
+    add_size_arguments(parser)
+    parser.add_argument("--data-dir", default="bench_data", help="working directory for the synthetic run")
+    parser.add_argument("--format", default="csv", choices=["csv", "arrow"])
+    parser.add_argument("--scoring", default="count", choices=SCORING_MODES)
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--role-dedup", default=genratedata.ROLE_DEDUP, type=lambda v: None if v == "none" else v,
+                        choices=ROLE_DEDUP_MODES, help="exact, near or none")
+    parser.add_argument("--workers", type=int, default=genratedata.N_WORKERS)
+    parser.add_argument("--shard-size", type=int, default=genratedata.SHARD_SIZE)
+    parser.add_argument("--out", default="bench_results.json", help="where to save the results JSON")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per stage (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    out_path = os.path.abspath(args.out)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    # Pipeline settings for this run (workers are forked, so they see these too)
+    genratedata.OUTPUT_FORMAT = args.format
+    genratedata.SCORING = args.scoring
+    genratedata.TOP_K = args.top_k
+    genratedata.ROLE_DEDUP = args.role_dedup
+    genratedata.N_WORKERS = args.workers
+    genratedata.SHARD_SIZE = args.shard_size
+    genratedata.MAX_EMPLOYEES = args.employees
+    genratedata.SEED = args.seed
+
+    profiler = Profiler("benchmark")
+    print(f"Benchmarking in {args.data_dir}/ ...")
+    run_stage(
+        profiler, "synthetic_data",
+        lambda: write_source_csvs(args.data_dir, args.employees, args.roles, args.skills_per_role, args.vocab_size, args.seed,
+                                  args.duplicate_rate),
+        rows=args.employees + args.roles
+    )
+    os.chdir(args.data_dir)
+    benchmark_pipeline(profiler)
+    benchmark_app(profiler, args.seed, args.scoring)
+
+    results = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'sizes': {
+            'employees': args.employees,
+            'roles': args.roles,
+            'skills_per_role': args.skills_per_role,
+            'vocab_size': args.vocab_size,
+            'duplicate_rate': args.duplicate_rate,
+        },
+        'config': {
+            'format': args.format,
+            'scoring': args.scoring,
+            'top_k': args.top_k,
+            'role_dedup': args.role_dedup,
+            'workers': args.workers,
+            'shard_size': args.shard_size,
+            'seed': args.seed,
+        },
+        'stages': [{k: v for k, v in r.items() if k not in ('source', 'run')} for r in profiler.records],
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'peak_worker_rss_mb': round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"✅ Results saved to {out_path} (peak RSS {results['peak_rss_mb']} MB)")
+
+    if baseline is not None:
+        if baseline.get('sizes') != results['sizes'] or baseline.get('config') != results['config']:
+            print("⚠️ Baseline was recorded with different sizes or settings; comparing anyway.")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ Performance regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("✅ No stage regressed against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
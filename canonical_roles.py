@@ -0,0 +1,186 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+from scoring import top_k_indices
+
+# =========================
+# Role canonicalization (dedup before scoring)
+# =========================
+# Postings with the same normalized title and the same skill set are one
+# canonical role: every employee scores identically against all of them, so
+# Step 5 scores each canonical role once and copies the result back to the
+# member postings (see build_recommendations(groups=...)). Output rows stay
+# per posting and are identical to scoring every posting.
+#
+# "near" mode also merges postings of the same title whose skill set is a
+# near-duplicate (Jaccard >= threshold) of the group's first posting, found
+# with MinHash + LSH banding. Those members are scored with the first
+# posting's skill set, so their scores are approximate.
+
+ROLE_DEDUP_MODES = (None, "exact", "near")
+
+# MinHash signature length = LSH_BANDS * LSH_ROWS; more bands find more
+# near-duplicate candidates (all candidates are verified with exact Jaccard)
+LSH_BANDS = 16
+LSH_ROWS = 4
+MINHASH_PRIME = (1 << 31) - 1
+MINHASH_CHUNK_ROWS = 50_000
+
+
+def normalize_titles(titles):
+    # "Sr. Data  Analyst " -> "sr data analyst"
+    return (
+        pd.Series(titles).fillna("").astype(str).str.lower()
+        .str.replace(r"[^0-9a-z]+", " ", regex=True).str.strip()
+    )
+
+
+def _row_digests(role_matrix):
+    # One digest per row of the (sorted-index) CSR matrix, i.e. per skill set
+    indices, indptr = role_matrix.indices, role_matrix.indptr
+    return [
+        hashlib.blake2b(indices[indptr[i]:indptr[i + 1]].tobytes(), digest_size=8).digest()
+        for i in range(role_matrix.shape[0])
+    ]
+
+
+def minhash_signatures(role_matrix, n_hashes, seed=42):
+    # (n_rows, n_hashes) MinHash of each row's skill columns, computed in
+    # row chunks to bound the (n_hashes x nnz) intermediate; empty rows get -1
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MINHASH_PRIME, n_hashes, dtype=np.int64)
+    b = rng.integers(0, MINHASH_PRIME, n_hashes, dtype=np.int64)
+    n_rows = role_matrix.shape[0]
+    signatures = np.full((n_rows, n_hashes), -1, dtype=np.int64)
+    for lo in range(0, n_rows, MINHASH_CHUNK_ROWS):
+        chunk = role_matrix[lo:lo + MINHASH_CHUNK_ROWS]
+        lengths = np.diff(chunk.indptr)
+        rows = np.flatnonzero(lengths)
+        if not len(rows):
+            continue
+        hashed = (a[:, None] * chunk.indices[None, :].astype(np.int64) + b[:, None]) % MINHASH_PRIME
+        signatures[lo + rows] = np.minimum.reduceat(hashed, chunk.indptr[rows], axis=1).T
+    return signatures
+
+
+def _merge_near_duplicates(group_of, title_codes, role_matrix, threshold, seed):
+    # Exact groups in first-seen order: each joins the first earlier
+    # near-duplicate group that shares its title and an LSH bucket and whose
+    # first posting (the representative the members are scored with) has
+    # skill-set Jaccard >= threshold with it; otherwise it starts a group.
+    # Only representatives are compared, so similarity never chains.
+    n_groups = group_of.max() + 1 if len(group_of) else 0
+    reps = np.unique(group_of, return_index=True)[1]
+    rep_matrix = role_matrix[reps]
+    signatures = minhash_signatures(rep_matrix, LSH_BANDS * LSH_ROWS, seed)
+    skill_sets = [set(rep_matrix.indices[rep_matrix.indptr[i]:rep_matrix.indptr[i + 1]].tolist())
+                  for i in range(n_groups)]
+
+    root_of = np.arange(n_groups)
+    buckets = [{} for _ in range(LSH_BANDS)]
+    for g in np.flatnonzero(signatures[:, 0] >= 0):
+        keys = [(title_codes[reps[g]], signatures[g, band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+                for band in range(LSH_BANDS)]
+        candidates = sorted({r for band, key in enumerate(keys) for r in buckets[band].get(key, ())})
+        a = skill_sets[g]
+        for r in candidates:
+            b = skill_sets[r]
+            if len(a & b) >= threshold * len(a | b):
+                root_of[g] = r
+                break
+        else:
+            # A new representative: later groups are bucketed against it
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(g)
+    # Renumber in first-seen order
+    _, canon_of_group = np.unique(root_of, return_inverse=True)
+    return canon_of_group[group_of]
+
+
+def canonicalize_roles(role_titles, role_matrix, mode="exact", threshold=0.8, seed=42):
+    # Returns canon_of: canonical role index per posting, numbered in order
+    # of first appearance (so the first member is the representative)
+    if mode not in ROLE_DEDUP_MODES:
+        raise ValueError(f"❌ Unknown role dedup mode '{mode}', expected one of {ROLE_DEDUP_MODES}")
+    n_roles = role_matrix.shape[0]
+    if mode is None:
+        return np.arange(n_roles)
+    titles = normalize_titles(role_titles)
+    title_codes = pd.factorize(titles)[0]
+    keys = pd.Series(list(zip(title_codes, _row_digests(role_matrix))))
+    canon_of = pd.factorize(keys)[0]
+    if mode == "near":
+        canon_of = _merge_near_duplicates(canon_of, title_codes, role_matrix, threshold, seed)
+    return canon_of
+
+
+def canonical_roles_table(canon_of, role_ids, role_titles):
+    # One row per canonical role: its id, normalized title, size and members
+    role_ids = np.asarray(role_ids).astype(str)
+    sizes = np.bincount(canon_of)
+    members = np.split(role_ids[np.argsort(canon_of, kind="stable")], np.cumsum(sizes)[:-1])
+    first = np.unique(canon_of, return_index=True)[1]
+    return pd.DataFrame({
+        'canonical_role_id': ['C' + str(i + 1) for i in range(len(first))],
+        'canonical_title': normalize_titles(np.asarray(role_titles, dtype=object)[first]).to_numpy(),
+        'n_postings': sizes,
+        'role_ids': [", ".join(ids) for ids in members],
+    })
+
+
+class RoleGroups:
+    # Posting -> canonical role mapping used by build_recommendations: scores
+    # are computed over canonical roles, results are reported per posting
+    def __init__(self, canon_of, role_matrix):
+        self.canon_of = np.asarray(canon_of, dtype=np.int64)
+        self.n_postings = len(self.canon_of)
+        self.representatives = np.unique(self.canon_of, return_index=True)[1]
+        self.role_matrix = role_matrix[self.representatives]
+
+    @property
+    def n_canonical(self):
+        return len(self.representatives)
+
+    def dedup_ratio(self):
+        return self.n_postings / max(self.n_canonical, 1)
+
+    def top_k_selector(self, tie_rank, k):
+        return _GroupTopK(self.canon_of, tie_rank, k)
+
+
+class _GroupTopK:
+    # Exact posting-level top-k from canonical scores. A posting can only be
+    # in the top k if its group is in the top k groups ranked by (score,
+    # best member's tie rank), and only among that group's k best members;
+    # so candidates are the first k members of the top k groups.
+    def __init__(self, canon_of, tie_rank, k):
+        n_postings = len(canon_of)
+        n_groups = canon_of.max() + 1 if n_postings else 0
+        self.k = min(k, n_postings)
+        self.n_postings = n_postings
+        self.tie_rank = tie_rank
+
+        order = np.lexsort((tie_rank, canon_of))
+        starts = np.searchsorted(canon_of[order], np.arange(n_groups))
+        position = np.arange(n_postings) - np.repeat(starts, np.diff(np.append(starts, n_postings)))
+        keep = position < self.k
+        self.first_members = np.full((n_groups, max(self.k, 1)), -1, dtype=np.int64)
+        self.first_members[canon_of[order][keep], position[keep]] = order[keep]
+
+        best_rank = tie_rank[order[starts]] if n_groups else np.empty(0, dtype=np.int64)
+        self.group_tie_rank = np.empty(n_groups, dtype=np.int64)
+        self.group_tie_rank[np.argsort(best_rank)] = np.arange(n_groups)
+
+    def top_k(self, scores):
+        # scores: (employees x canonical roles) -> (employees x k) posting indices
+        if self.k == 0:
+            return np.empty((scores.shape[0], 0), dtype=np.int64)
+        top_groups = top_k_indices(scores, self.k, self.group_tie_rank)
+        candidates = self.first_members[top_groups].reshape(scores.shape[0], -1)
+        group_scores = np.take_along_axis(scores, top_groups, axis=1).astype(np.int64)
+        cand_scores = np.repeat(group_scores, self.first_members.shape[1], axis=1)
+        key = cand_scores * self.n_postings + (self.n_postings - 1 - self.tie_rank[candidates])
+        key[candidates < 0] = -1
+        best = np.argsort(-key, axis=1, kind="stable")[:, :self.k]
+        return np.take_along_axis(candidates, best, axis=1)
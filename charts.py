@@ -0,0 +1,38 @@
+import numpy as np
+
+# =========================
+# Precomputed chart data for the dashboard
+# =========================
+# The global match score distribution only changes when the dataset does, so
+# the histogram and its KDE curve are computed once per dataset version and
+# the app draws them as plain bars + a line, with the per-employee lines on top.
+
+# Above this many distinct scores, the KDE runs on a fine histogram instead
+MAX_KDE_POINTS = 4096
+
+
+def score_histogram(scores, bins=20):
+    # Same bins as sns.histplot(scores, bins=20)
+    counts, edges = np.histogram(scores, bins=bins)
+    return counts, edges
+
+
+def score_kde(scores, edges, gridsize=200):
+    # Gaussian KDE with Scott's bandwidth, evaluated on the data range and
+    # scaled to histogram counts, as sns.histplot(..., kde=True) draws it.
+    # Scores are collapsed to (value, count) pairs first, so the cost depends
+    # on the number of distinct scores, not the number of employee-role pairs.
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    if n < 2 or scores.std() == 0:
+        return None, None
+    values, weights = np.unique(scores, return_counts=True)
+    if len(values) > MAX_KDE_POINTS:
+        weights, fine_edges = np.histogram(scores, bins=MAX_KDE_POINTS)
+        values = (fine_edges[:-1] + fine_edges[1:]) / 2
+
+    bandwidth = scores.std(ddof=1) * n ** (-1 / 5)
+    grid = np.linspace(scores.min(), scores.max(), gridsize)
+    kernels = np.exp(-0.5 * ((grid[None, :] - values[:, None]) / bandwidth) ** 2)
+    density = (weights @ kernels) / (n * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density * n * np.diff(edges).mean()
@@ -0,0 +1,43 @@
+import io
+import numpy as np
+
+from artifacts import write_frames, with_skill_strings
+
+# =========================
+# Chunked exports of the Recommendations table
+# =========================
+# Downloads are written on demand, EXPORT_CHUNK_ROWS rows at a time, as
+# gzip-compressed CSV or Parquet. Only the selected rows are exported, and
+# Arrow skill_id lists are expanded to names one chunk at a time, so no
+# full-size string copy of the table is ever built.
+
+EXPORT_FORMATS = ("csv.gz", "parquet")
+EXPORT_MIME_TYPES = {"csv.gz": "application/gzip", "parquet": "application/vnd.apache.parquet"}
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def select_rows(recs_df, employee_ids=None, min_score=None):
+    # Positions of the rows to export (None = every row)
+    if not employee_ids and min_score is None:
+        return None
+    mask = np.ones(len(recs_df), dtype=bool)
+    if employee_ids:
+        mask &= recs_df['employee_id'].isin(list(employee_ids)).to_numpy()
+    if min_score is not None:
+        mask &= recs_df['match_score'].to_numpy() >= min_score
+    return np.flatnonzero(mask)
+
+
+def iter_export_chunks(recs_df, rows=None, vocabulary=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Yields the selected rows in table order, with skill names (see with_skill_strings)
+    n_rows = len(recs_df) if rows is None else len(rows)
+    for lo in range(0, n_rows, chunk_rows):
+        chunk = recs_df.iloc[lo:lo + chunk_rows] if rows is None else recs_df.iloc[rows[lo:lo + chunk_rows]]
+        yield with_skill_strings(chunk, vocabulary) if vocabulary is not None else chunk
+
+
+def export_bytes(recs_df, fmt="csv.gz", rows=None, vocabulary=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    buffer = io.BytesIO()
+    columns = with_skill_strings(recs_df.iloc[:0], vocabulary).columns if vocabulary is not None else recs_df.columns
+    write_frames(iter_export_chunks(recs_df, rows, vocabulary, chunk_rows), buffer, fmt, list(columns))
+    return buffer.getvalue()
@@ -1,82 +1,157 @@
+import os
 import pandas as pd
 import random
+import time
+import tracemalloc
 import matplotlib.pyplot as plt
 import seaborn as sns
-import json
+from concurrent.futures import ProcessPoolExecutor
+from ingest import stream_job_skills, stream_job_postings
+from vocabulary import SkillVocabulary
+from scoring import encode_employees, encode_roles, build_recommendations, role_tie_rank, score_chunk_rows, MatchScorer
+from artifacts import write_table, write_partition, read_partition, reset_partitions, merge_partitions, with_skill_strings
+import learning_paths
+from instrumentation import Profiler
+from canonical_roles import canonicalize_roles, canonical_roles_table, RoleGroups, LSH_BANDS, LSH_ROWS
+from ann_index import RoleLSHIndex
+from incremental import (
+    KEEP, EXTEND, RESCORE, employee_fingerprints, role_fingerprints, load_manifest, save_manifest,
+    previous_employee_skills, plan_shards, merge_appended_roles
+)
+
+# Output format for Skills/Roles/Employees/EmployeeSkills/Recommendations:
+# "csv" or "arrow" (memory-mappable Arrow IPC files, see artifacts.py)
+OUTPUT_FORMAT = "csv"
+
+# Memory per worker for one chunk of dense scores in Step 5; the number of
+# employees per sparse matrix product is derived from it and the role count
+# (see scoring.score_chunk_rows). Total is about N_WORKERS x this.
+SCORING_MEMORY_BUDGET_MB = 256
+
+# How match_score is computed: "count" (matched skills, the original score),
+# "coverage", "jaccard" or "idf" (normalized 0-1 scores, see scoring.py).
+# The normalized modes ignore the "Python" skill that every role requires.
+SCORING = "count"
+
+# Keep only the TOP_K best roles per employee in Recommendations.csv
+# (None = every employee-role pair). The app only ever shows the top 5.
+TOP_K = None
+# How equal match scores are ordered in top-K mode: "role_order", "fewest_missing" or "random"
+TIE_BREAK = "role_order"
+
+# Postings that are the same role (same normalized title and skill set) are
+# scored once and the result is copied to each of them ("exact": output is
+# unchanged). "near" also merges postings of the same title whose skill set
+# overlaps the group's first posting by at least NEAR_DUPLICATE_THRESHOLD
+# (Jaccard, via MinHash/LSH); they are scored with that posting's skills.
+# None = score every posting.
+# The groups are written to CanonicalRoles.csv.
+ROLE_DEDUP = "exact"
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# How each employee's TOP_K roles are found: "exact" scores every role;
+# "ann" only rescores the candidate roles an LSH index returns (see
+# ann_index.py), for very large role catalogs. Requires TOP_K. More
+# ANN_BANDS = higher recall and slower, more ANN_ROWS_PER_BAND = faster and
+# lower recall; measure with `python ann_index.py` on the generated data.
+ROLE_SEARCH = "exact"
+ANN_BANDS = 32
+ANN_ROWS_PER_BAND = 1
+
+# Source CSVs are streamed in chunks sized to stay within this parse buffer
+INGEST_MEMORY_BUDGET_MB = 256
+
+# Steps 5 and 6 run per shard of SHARD_SIZE consecutive employees on N_WORKERS
+# processes (1 = run in this process). Shard boundaries depend only on
+# SHARD_SIZE, so the merged output is identical for any worker count.
+N_WORKERS = os.cpu_count() or 1
+SHARD_SIZE = 64
+
+# Reuse the previous run's outputs (see Manifest.json / incremental.py): shards
+# whose employees are unchanged are kept, and roles appended to job_postings.csv
+# are scored into them without rescoring the rest. Existing employees keep
+# their previously assigned skills.
+INCREMENTAL = False
+
+# Employees sampled from HR_Analytics.csv in Step 3
+MAX_EMPLOYEES = 200
+
+# Per-stage timings / memory are appended to PROFILE_LOG (JSON Lines, None =
+# don't write) and summarized at the end of the run. TRACE_MEMORY adds
+# tracemalloc peaks, at a noticeable cost in allocation-heavy steps.
+PROFILE_LOG = "Profile.jsonl"
+TRACE_MEMORY = False
+
+# Seed for the employee sample (Step 3), random skill assignment (Step 4)
+# and random tie-breaking (Step 5)
+SEED = 42
 
 # =========================
 # Step 1: Create Skills.csv
 # =========================
-# ASSUMES 'job_skills.csv' IS PRESENT
-try:
-    df_skills = pd.read_csv("job_skills.csv")
-except FileNotFoundError:
-    print("FATAL ERROR: job_skills.csv not found. Please provide this file.")
-    exit()
-
-df_skills.columns = df_skills.columns.str.strip()
-
-# Process skills into a list
-all_skills = []
-for skills_str in df_skills['job_skills'].dropna():
-    skills_list = [s.strip() for s in skills_str.split(',') if s.strip()]
-    all_skills.extend(skills_list)
+def create_skills():
+    # ASSUMES 'job_skills.csv' IS PRESENT
+    # Single streamed pass: the sorted skill vocabulary plus each posting's skill_ids
+    # (reused by Step 5, so the file is never read twice)
+    try:
+        unique_skills, job_link_to_skill_ids = stream_job_skills("job_skills.csv", INGEST_MEMORY_BUDGET_MB)
+    except FileNotFoundError:
+        print("FATAL ERROR: job_skills.csv not found. Please provide this file.")
+        exit()
 
-# Get unique sorted skills
-unique_skills = sorted(set(all_skills))
+    # Guarantee "Python" appears in the unique skills list
+    if "Python" not in unique_skills:
+        unique_skills.append("Python")
 
-# Guarantee "Python" appears in the unique skills list
-if "Python" not in unique_skills:
-    unique_skills.append("Python")
+    # Intern skill names once: skill_id = position + 1
+    skills_df = SkillVocabulary(unique_skills).to_frame()
 
-# Create a DataFrame for Skills
-skills_df = pd.DataFrame({
-    "skill_id": range(1, len(unique_skills) + 1),
-    "skill_name": unique_skills
-})
+    write_table(skills_df, "Skills", OUTPUT_FORMAT)
+    print(f"✅ Skills.{OUTPUT_FORMAT} created with {len(unique_skills)} unique skills.")
+    return skills_df, job_link_to_skill_ids
 
-skills_df.to_csv("Skills.csv", index=False)
-print(f"✅ Skills.csv created with {len(unique_skills)} unique skills.")
 
 # =========================
 # Step 2: Create Roles.csv
 # =========================
-# ASSUMES 'job_postings.csv' IS PRESENT
-try:
-    job_postings = pd.read_csv("job_postings.csv")
-except FileNotFoundError:
-    print("FATAL ERROR: job_postings.csv not found. Please provide this file.")
-    exit()
-
-# Ensure necessary columns are present
-if 'job_link' in job_postings.columns and 'job_title' in job_postings.columns:
-    roles_df = job_postings[['job_link', 'job_title']].drop_duplicates()
+def create_roles():
+    # ASSUMES 'job_postings.csv' IS PRESENT
+    # Streams only the job_link / job_title columns (raises ValueError if either is missing)
+    try:
+        roles_df = stream_job_postings("job_postings.csv", INGEST_MEMORY_BUDGET_MB)
+    except FileNotFoundError:
+        print("FATAL ERROR: job_postings.csv not found. Please provide this file.")
+        exit()
+
     roles_df['role_id'] = ['R' + str(i + 1) for i in range(len(roles_df))]
     roles_df.rename(columns={
         'job_link': 'role_external_link',
         'job_title': 'role_name'
     }, inplace=True)
-    roles_df.to_csv("Roles.csv", index=False)
-    print("✅ Roles.csv created.")
-else:
-    raise ValueError("❌ 'job_link' or 'job_title' column missing in job_postings.csv")
+    write_table(roles_df, "Roles", OUTPUT_FORMAT)
+    print(f"✅ Roles.{OUTPUT_FORMAT} created.")
+    return roles_df
+
 
 # =========================
 # Step 3: Create Employees.csv (limit to 200 employees)
 # =========================
-# ASSUMES 'HR_Analytics.csv' IS PRESENT
-try:
-    hr_df = pd.read_csv("HR_Analytics.csv")
-except FileNotFoundError:
-    print("FATAL ERROR: HR_Analytics.csv not found. Please provide this file.")
-    exit()
-
-# Ensure the required columns exist
-if all(col in hr_df.columns for col in ['EmpID', 'JobRole']):
+def create_employees():
+    # ASSUMES 'HR_Analytics.csv' IS PRESENT
+    try:
+        hr_df = pd.read_csv("HR_Analytics.csv")
+    except FileNotFoundError:
+        print("FATAL ERROR: HR_Analytics.csv not found. Please provide this file.")
+        exit()
+
+    # Ensure the required columns exist
+    if not all(col in hr_df.columns for col in ['EmpID', 'JobRole']):
+        raise ValueError("❌ 'EmpID' or 'JobRole' column missing in HR_Analytics.csv")
+
     employees_df = hr_df[['EmpID', 'JobRole']].drop_duplicates()
 
-    # Limit to 200 employees, or take all if fewer than 200
-    employees_df = employees_df.sample(n=min(200, len(employees_df)), random_state=42)
+    # Limit to MAX_EMPLOYEES (200) employees, or take all if fewer
+    employees_df = employees_df.sample(n=min(MAX_EMPLOYEES, len(employees_df)), random_state=SEED)
 
     # Assign employee IDs
     employees_df['employee_id'] = ['E' + str(i + 1) for i in range(len(employees_df))]
@@ -85,151 +160,333 @@ if all(col in hr_df.columns for col in ['EmpID', 'JobRole']):
         'JobRole': 'current_role'
     }, inplace=True)
 
-    employees_df.to_csv("Employees.csv", index=False)
-    print("✅ Employees.csv created with only 200 employees.")
-else:
-    raise ValueError("❌ 'EmpID' or 'JobRole' column missing in HR_Analytics.csv")
+    write_table(employees_df, "Employees", OUTPUT_FORMAT)
+    print(f"✅ Employees.{OUTPUT_FORMAT} created with only {MAX_EMPLOYEES} employees.")
+    return employees_df
+
 
 # =========================
 # Step 4: Create EmployeeSkills.csv
 # =========================
-skills_df = pd.read_csv("Skills.csv")
-employee_ids = employees_df['employee_id'].tolist()
-skill_ids = skills_df['skill_id'].tolist()
-
-# Assign random skills to employees
-employee_skill_records = []
-for emp in employee_ids:
-    assigned_skills = random.sample(skill_ids, k=random.randint(5, min(15, len(skill_ids))))
-    employee_skill_records += [{'employee_id': emp, 'skill_id': skill} for skill in assigned_skills]
-
-# Guarantee at least one employee has "Python"
-python_id = skills_df[skills_df['skill_name'] == "Python"]['skill_id'].values[0]
-e1 = employees_df['employee_id'].iloc[0]
-if not any((rec['employee_id'] == e1 and rec['skill_id'] == python_id) for rec in employee_skill_records):
-    employee_skill_records.append({'employee_id': e1, 'skill_id': python_id})
-
-employee_skills_df = pd.DataFrame(employee_skill_records)
-employee_skills_df.to_csv("EmployeeSkills.csv", index=False)
-print("✅ EmployeeSkills.csv created.")
+def create_employee_skills(employees_df, skills_df, previous=None):
+    # previous: {(employee_id, original_emp_id): [skill names]} from the last
+    # run (incremental mode); those employees keep their skills
+    previous = previous or {}
+    rng = random.Random(SEED)
+    employee_ids = employees_df['employee_id'].tolist()
+    original_ids = employees_df['original_emp_id'].astype(str).tolist()
+    skill_ids = skills_df['skill_id'].tolist()
+    vocabulary = SkillVocabulary.from_frame(skills_df)
+
+    # Assign random skills to employees
+    employee_skill_records = []
+    for emp, original in zip(employee_ids, original_ids):
+        assigned_skills = rng.sample(skill_ids, k=rng.randint(5, min(15, len(skill_ids))))
+        if (emp, original) in previous:
+            assigned_skills = vocabulary.ids_for_names(previous[(emp, original)])
+        employee_skill_records += [{'employee_id': emp, 'skill_id': skill} for skill in assigned_skills]
+
+    # Guarantee at least one employee has "Python"
+    python_id = skills_df[skills_df['skill_name'] == "Python"]['skill_id'].values[0]
+    e1 = employees_df['employee_id'].iloc[0]
+    if not any((rec['employee_id'] == e1 and rec['skill_id'] == python_id) for rec in employee_skill_records):
+        employee_skill_records.append({'employee_id': e1, 'skill_id': python_id})
+
+    employee_skills_df = pd.DataFrame(employee_skill_records)
+    write_table(employee_skills_df, "EmployeeSkills", OUTPUT_FORMAT)
+    print(f"✅ EmployeeSkills.{OUTPUT_FORMAT} created.")
+    return employee_skills_df, python_id
+
 
 # =========================
 # Step 5: Create Recommendations.csv (with matched & missing skills for IDP)
 # =========================
-# Reloading dataframes ensures the latest files are used if this script is run sequentially
-roles_df = pd.read_csv("Roles.csv")
-skills_df = pd.read_csv("Skills.csv")
-employee_skills_df = pd.read_csv("EmployeeSkills.csv")
-job_skills_df = pd.read_csv("job_skills.csv") # Need to reload the original file to map roles
-
-skillname_to_id = {row['skill_name']: row['skill_id'] for _, row in skills_df.iterrows()}
-id_to_skillname = {row['skill_id']: row['skill_name'] for _, row in skills_df.iterrows()}
-
-# Preprocess job skills
-job_link_to_skills = {}
-for _, row in job_skills_df.iterrows():
-    role_skills = [s.strip() for s in str(row['job_skills']).split(",") if s.strip()]
-    if "Python" not in role_skills:
-        role_skills.append("Python")
-    job_link_to_skills[row['job_link']] = role_skills
-
-recommendations = []
-for i, emp in enumerate(employees_df['employee_id'], 1):
-    emp_skill_ids = set(employee_skills_df[employee_skills_df['employee_id'] == emp]['skill_id'])
-    emp_skills = {id_to_skillname[s] for s in emp_skill_ids}
-
-    for _, role_row in roles_df.iterrows():
-        role_id = role_row['role_id']
-        job_link = role_row['role_external_link']
-
-        role_skill_names = job_link_to_skills.get(job_link, [])
-        role_skills = set(role_skill_names)
-
-        matched = emp_skills & role_skills
-        missing = role_skills - emp_skills
-        match_score = len(matched)
-
-        recommendations.append({
-            'employee_id': emp,
-            'role_id': role_id,
-            'match_score': match_score,
-            'matched_skills': ", ".join(matched),
-            'missing_skills': ", ".join(missing)
-        })
-    if i % 20 == 0:
-        print(f"Processed {i}/{len(employees_df)} employees...")
-
-recommendations_df = pd.DataFrame(recommendations)
-recommendations_df.to_csv("Recommendations.csv", index=False)
-print("✅ Recommendations.csv created with matched & missing skills!")
+def score_shard(state, lo, hi):
+    # Recommendations for employees lo..hi-1
+    return build_recommendations(
+        state['employee_ids'][lo:hi],
+        state['role_ids'],
+        state['emp_matrix'][lo:hi],
+        state['role_matrix'],
+        state['skill_names'],
+        chunk_size=state['chunk_size'],
+        top_k=TOP_K,
+        tie_break=TIE_BREAK,
+        seed=SEED,
+        verbose=False,
+        skill_ids=state['vocabulary'].ids,
+        scorer=state['scorer'],
+        groups=state['groups'],
+        retriever=state['retriever']
+    )
+
 
 # =========================
 # Step 6: Learning Path Generator (UNIQUE FEATURE 🚀)
 # =========================
-skill_resources = {
-    "Python": ["https://www.w3schools.com/python/", "https://www.kaggle.com/learn/python"],
-    "SQL": ["https://www.sqlbolt.com/", "https://mode.com/sql-tutorial/"],
-    "Machine Learning": ["https://www.coursera.org/learn/machine-learning", "https://scikit-learn.org/"],
-    "Excel": ["https://exceljet.net/", "https://www.udemy.com/course/excel-for-beginners/"],
-    "Tableau": ["https://public.tableau.com/en-us/s/resources", "https://www.datacamp.com/courses/tableau-fundamentals"]
-    # 🔹 Add more as needed
-}
-
-recommendations_with_path = []
-for _, row in recommendations_df.iterrows():
-    missing = [m.strip() for m in row['missing_skills'].split(",") if m.strip()]
-    roadmap = {}
-    for skill in missing:
-        if skill in skill_resources:
-            roadmap[skill] = skill_resources[skill]
-        else:
-            roadmap[skill] = ["No resource found (add manually)"]
-
-    recommendations_with_path.append({
-        "employee_id": row['employee_id'],
-        "role_id": row['role_id'],
-        "match_score": row['match_score'],
-        "learning_path": roadmap
-    })
+# Written per shard as compact JSON Lines (missing skill ids only) plus one
+# shared skill -> resources table; see learning_paths.py for the format and
+# LearningPathStore for expanding a single employee's path.
 
-# Save as JSON for easy frontend integration
-with open("LearningPaths.json", "w") as f:
-    json.dump(recommendations_with_path, f, indent=4)
-
-print("✅ Learning Paths generated for each employee-role recommendation!")
 
 # =========================
-# Step 7: Visualization (These are just for local script testing)
+# Steps 5 + 6 on a shard of employees (runs in a worker process)
 # =========================
-
-# 1. Employee-Skill Heatmap
-pivot_df = employee_skills_df.pivot_table(
-    index='employee_id', 
-    columns='skill_id', 
-    aggfunc='size', 
-    fill_value=0
-)
-# Note: The Streamlit app handles the visualization. These are just for confirming the data generation.
-# plt.figure(figsize=(12,6))
-# sns.heatmap(pivot_df, cmap="Blues", cbar=False)
-# plt.title("Employee-Skill Matrix")
-# plt.show()
-
-# 2. Match Score Distribution
-# plt.figure(figsize=(8,5))
-# plt.hist(recommendations_df['match_score'], bins=20, color='skyblue', edgecolor='black')
-# plt.xlabel("Match Score")
-# plt.ylabel("Number of Employee-Role Pairs")
-# plt.title("Distribution of Match Scores")
-# plt.show()
-
-# 3. Example: Show top recommendations + roadmap
-# emp = employees_df['employee_id'].iloc[0]
-# emp_recs = [rec for rec in recommendations_with_path if rec['employee_id'] == emp]
-# emp_recs = sorted(emp_recs, key=lambda x: x['match_score'], reverse=True)[:3]
-
-# print(f"\n🔎 Top Recommendations & Learning Path for {emp}:")
-# for rec in emp_recs:
-#     print(f"Role: {rec['role_id']} | Match Score: {rec['match_score']}")
-#     for skill, resources in rec['learning_path'].items():
-#         print(f"  - {skill}: {', '.join(resources)}")
+_worker_state = {}
+
+
+def _init_worker(state):
+    # Shared inputs are handed over once per worker, not once per shard
+    _worker_state.update(state)
+
+
+def _init_pool_worker(state):
+    # Forked workers inherit tracemalloc (TRACE_MEMORY) but never report it
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _init_worker(state)
+
+
+def _write_shard_outputs(shard_no, recommendations_df, timings):
+    # timings: {stage: seconds} for this shard, summed up by run_sharded()
+    start = time.perf_counter()
+    write_partition(recommendations_df, "Recommendations", OUTPUT_FORMAT, shard_no, skills_df=_worker_state['skills_df'])
+    timings['shard_write_recommendations'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    learning_paths.write_partition(recommendations_df, shard_no, _worker_state['vocabulary'])
+    timings['shard_write_learning_paths'] = time.perf_counter() - start
+    return shard_no, len(recommendations_df), timings
+
+
+def run_shard(shard_no, lo, hi):
+    start = time.perf_counter()
+    recommendations_df = score_shard(_worker_state, lo, hi)
+    return _write_shard_outputs(shard_no, recommendations_df, {'shard_score': time.perf_counter() - start})
+
+
+def extend_shard(shard_no, lo, hi, appended_from):
+    # Incremental mode: only the roles appended since the last run are scored;
+    # the shard's previous partition supplies every other row
+    state = _worker_state
+    start = time.perf_counter()
+    new_df = build_recommendations(
+        state['employee_ids'][lo:hi],
+        state['role_ids'][appended_from:],
+        state['emp_matrix'][lo:hi],
+        state['role_matrix'][appended_from:],
+        state['skill_names'],
+        chunk_size=score_chunk_rows(len(state['role_ids']) - appended_from, SCORING_MEMORY_BUDGET_MB),
+        top_k=TOP_K,
+        tie_break=TIE_BREAK,
+        seed=SEED,
+        verbose=False,
+        scorer=MatchScorer(state['role_matrix'][appended_from:], SCORING, state['ignore_cols'])
+    )
+    old_df = read_partition("Recommendations", OUTPUT_FORMAT, shard_no)
+    old_df = with_skill_strings(old_df, state['previous_vocabulary'])
+    old_df[['matched_skills', 'missing_skills']] = old_df[['matched_skills', 'missing_skills']].fillna("")
+    merged = merge_appended_roles(
+        old_df, new_df,
+        {str(e): i for i, e in enumerate(state['employee_ids'][lo:hi])},
+        state['role_order'],
+        TOP_K,
+        state['tie_rank']
+    )
+    return _write_shard_outputs(shard_no, merged, {'shard_score': time.perf_counter() - start})
+
+
+def run_sharded(employees_df, roles_df, skills_df, employee_skills_df, job_link_to_skill_ids, python_id, manifest=None,
+                profiler=None):
+    profiler = profiler or Profiler("genratedata")
+    vocabulary = SkillVocabulary.from_frame(skills_df)
+    skill_names, skill_id_to_col = vocabulary.names, vocabulary.id_to_col
+
+    # Encode employees and roles as sparse skill matrices once; shards slice rows
+    with profiler.stage("encode_matrices") as stage:
+        employee_ids = employees_df['employee_id'].tolist()
+        role_ids = roles_df['role_id'].tolist()
+        role_links = roles_df['role_external_link'].tolist()
+        emp_matrix = encode_employees(employee_ids, employee_skills_df, skill_id_to_col)
+        # Every role also requires "Python" (python_id from Step 4)
+        role_matrix = encode_roles(role_links, job_link_to_skill_ids, skill_id_to_col, python_id)
+        stage.count(rows=len(employee_ids) + len(role_ids))
+
+    # Group duplicate postings so each canonical role is scored once
+    with profiler.stage("canonicalize_roles") as stage:
+        canon_of = canonicalize_roles(roles_df['role_name'], role_matrix, ROLE_DEDUP, NEAR_DUPLICATE_THRESHOLD, SEED)
+        groups = RoleGroups(canon_of, role_matrix) if ROLE_DEDUP is not None else None
+        if groups is not None:
+            write_table(canonical_roles_table(canon_of, role_ids, roles_df['role_name']), "CanonicalRoles", OUTPUT_FORMAT)
+            print(f"✅ CanonicalRoles.{OUTPUT_FORMAT} created: {len(role_ids)} postings -> {groups.n_canonical} "
+                  f"canonical roles ({groups.dedup_ratio():.2f}x fewer to score).")
+        stage.count(rows=len(role_ids), canonical_roles=groups.n_canonical if groups is not None else len(role_ids))
+
+    # Scoring weights are derived from all postings once, not per shard
+    ignore_cols = [skill_id_to_col[python_id]] if python_id in skill_id_to_col else []
+    scorer = MatchScorer(groups.role_matrix if groups is not None else role_matrix, SCORING, ignore_cols,
+                         weight_matrix=role_matrix)
+
+    # Candidate index over the scored (canonical) roles for approximate search
+    retriever = None
+    if ROLE_SEARCH == "ann":
+        if TOP_K is None:
+            raise ValueError("❌ ROLE_SEARCH = \"ann\" needs TOP_K to be set")
+        with profiler.stage("build_ann_index") as stage:
+            retriever = RoleLSHIndex(groups.role_matrix if groups is not None else role_matrix,
+                                     ANN_BANDS, ANN_ROWS_PER_BAND, ignore_cols, SEED)
+            stage.count(rows=retriever.n_roles)
+    elif ROLE_SEARCH != "exact":
+        raise ValueError(f"❌ Unknown ROLE_SEARCH '{ROLE_SEARCH}' (expected \"exact\" or \"ann\")")
+
+    shards = [(shard_no, lo, min(lo + SHARD_SIZE, len(employee_ids)))
+              for shard_no, lo in enumerate(range(0, len(employee_ids), SHARD_SIZE))]
+
+    # Decide per shard what to recompute (everything unless INCREMENTAL)
+    role_search = ROLE_SEARCH if retriever is None else f"ann:{ANN_BANDS}x{ANN_ROWS_PER_BAND}"
+    # Near-duplicate groups depend on the threshold and the LSH layout too
+    near_duplicates = [NEAR_DUPLICATE_THRESHOLD, LSH_BANDS, LSH_ROWS] if ROLE_DEDUP == "near" else None
+    config = {'scoring': SCORING, 'role_dedup': ROLE_DEDUP, 'near_duplicates': near_duplicates, 'role_search': role_search, 'top_k': TOP_K, 'tie_break': TIE_BREAK, 'format': OUTPUT_FORMAT, 'shard_size': SHARD_SIZE, 'seed': SEED}
+    with profiler.stage("plan_shards"):
+        employee_fps = employee_fingerprints(employee_ids, emp_matrix, skill_names)
+        role_fps = role_fingerprints(role_ids, role_links, role_matrix, skill_names)
+        plan, appended_from, reason = plan_shards(manifest, config, OUTPUT_FORMAT, shards, employee_ids, employee_fps, role_fps,
+                                                  skill_names)
+    if all(action == RESCORE for action in plan.values()):
+        reset_partitions("Recommendations")
+        reset_partitions("LearningPaths")
+    print(f"Recomputing {sum(a != KEEP for a in plan.values())}/{len(shards)} shards ({reason}).")
+
+    state = {
+        'employee_ids': employee_ids,
+        'role_ids': role_ids,
+        'emp_matrix': emp_matrix,
+        'role_matrix': role_matrix,
+        'skill_names': skill_names,
+        'skills_df': skills_df,
+        'vocabulary': vocabulary,
+        'scorer': scorer,
+        'groups': groups,
+        'retriever': retriever,
+        'ignore_cols': ignore_cols,
+        'chunk_size': score_chunk_rows(groups.n_canonical if groups is not None else len(role_ids), SCORING_MEMORY_BUDGET_MB),
+    }
+    if EXTEND in plan.values():
+        state['role_order'] = {str(r): i for i, r in enumerate(role_ids)}
+        state['tie_rank'] = role_tie_rank(role_matrix, TIE_BREAK, SEED)
+        state['previous_vocabulary'] = SkillVocabulary(manifest['skill_names'])
+
+    tasks = []
+    for shard_no, lo, hi in shards:
+        if plan[shard_no] == RESCORE:
+            tasks.append((run_shard, (shard_no, lo, hi)))
+        elif plan[shard_no] == EXTEND:
+            tasks.append((extend_shard, (shard_no, lo, hi, appended_from)))
+
+    # Worker time per sub-step, summed over shards (CPU-seconds across workers)
+    shard_seconds = {}
+    shard_rows = 0
+    with profiler.stage("score_shards") as stage:
+        if N_WORKERS <= 1:
+            _init_worker(state)
+            results = []
+            for done, (fn, args) in enumerate(tasks, 1):
+                results.append(fn(*args))
+                print(f"Processed shard {done}/{len(tasks)}...")
+        else:
+            with ProcessPoolExecutor(max_workers=N_WORKERS, initializer=_init_pool_worker, initargs=(state,)) as pool:
+                futures = [pool.submit(fn, *args) for fn, args in tasks]
+                results = []
+                for done, future in enumerate(futures, 1):
+                    results.append(future.result())
+                    print(f"Processed shard {done}/{len(tasks)}...")
+        for _, n_rows, timings in results:
+            shard_rows += n_rows
+            for name, seconds in timings.items():
+                shard_seconds[name] = shard_seconds.get(name, 0) + seconds
+        stage.count(shards=len(tasks), rows=shard_rows)
+    for name, seconds in shard_seconds.items():
+        profiler.record(name, seconds, rows=shard_rows)
+
+    # Merge step: partitions are concatenated in shard (= employee) order
+    with profiler.stage("merge_recommendations"):
+        merge_partitions("Recommendations", OUTPUT_FORMAT, len(shards))
+    print(f"✅ Recommendations.{OUTPUT_FORMAT} created with matched & missing skills!")
+    with profiler.stage("merge_learning_paths"):
+        learning_paths.write_resources(skills_df)
+        learning_paths.merge_partitions(len(shards))
+    print(f"✅ Learning Paths generated for each employee-role recommendation ({learning_paths.PATHS_FILE})!")
+
+    with profiler.stage("save_manifest"):
+        employees = dict(zip(employees_df['employee_id'], employees_df['original_emp_id']))
+        save_manifest(config, skill_names, employees, shards, employee_ids, employee_fps, role_fps)
+
+
+def main():
+    profiler = Profiler("genratedata", PROFILE_LOG, TRACE_MEMORY)
+
+    # Previous run's state must be read before the steps below overwrite it
+    with profiler.stage("load_manifest"):
+        manifest = load_manifest() if INCREMENTAL else None
+        previous = previous_employee_skills(manifest)
+
+    with profiler.stage("step1_skills") as stage:
+        skills_df, job_link_to_skill_ids = create_skills()
+        stage.count(rows=len(job_link_to_skill_ids), skills=len(skills_df))
+    with profiler.stage("step2_roles") as stage:
+        roles_df = create_roles()
+        stage.count(rows=len(roles_df))
+    with profiler.stage("step3_employees") as stage:
+        employees_df = create_employees()
+        stage.count(rows=len(employees_df))
+    with profiler.stage("step4_employee_skills") as stage:
+        employee_skills_df, python_id = create_employee_skills(employees_df, skills_df, previous)
+        stage.count(rows=len(employee_skills_df))
+    with profiler.stage("steps5_6_recommendations_and_paths") as stage:
+        run_sharded(employees_df, roles_df, skills_df, employee_skills_df, job_link_to_skill_ids, python_id, manifest,
+                    profiler)
+        stage.count(rows=len(employees_df) * len(roles_df))
+
+    print("\n⏱️ Stage timings" + (f" (appended to {PROFILE_LOG})" if PROFILE_LOG else "") + ":")
+    print(profiler.summary().to_string(index=False))
+
+    # =========================
+    # Step 7: Visualization (These are just for local script testing)
+    # =========================
+
+    # 1. Employee-Skill Heatmap
+    pivot_df = employee_skills_df.pivot_table(
+        index='employee_id',
+        columns='skill_id',
+        aggfunc='size',
+        fill_value=0
+    )
+    # Note: The Streamlit app handles the visualization. These are just for confirming the data generation.
+    # plt.figure(figsize=(12,6))
+    # sns.heatmap(pivot_df, cmap="Blues", cbar=False)
+    # plt.title("Employee-Skill Matrix")
+    # plt.show()
+
+    # 2. Match Score Distribution
+    # recommendations_df = read_table("Recommendations", OUTPUT_FORMAT)
+    # plt.figure(figsize=(8,5))
+    # plt.hist(recommendations_df['match_score'], bins=20, color='skyblue', edgecolor='black')
+    # plt.xlabel("Match Score")
+    # plt.ylabel("Number of Employee-Role Pairs")
+    # plt.title("Distribution of Match Scores")
+    # plt.show()
+
+    # 3. Example: Show top recommendations + roadmap
+    # emp = employees_df['employee_id'].iloc[0]
+    # emp_recs = learning_paths.LearningPathStore(skills_df=skills_df).expand(emp)
+    # emp_recs = sorted(emp_recs, key=lambda x: x['match_score'], reverse=True)[:3]
+
+    # print(f"\n🔎 Top Recommendations & Learning Path for {emp}:")
+    # for rec in emp_recs:
+    #     print(f"Role: {rec['role_id']} | Match Score: {rec['match_score']}")
+    #     for skill, resources in rec['learning_path'].items():
+    #         print(f"  - {skill}: {', '.join(resources)}")
+
+
+if __name__ == "__main__":
+    main()
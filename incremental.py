@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from artifacts import partition_path, read_table
+
+# =========================
+# Manifest + change detection for incremental regeneration
+# =========================
+# Every run records a fingerprint of each employee's skill set and of each
+# role's skill list (by skill *name*), grouped by output shard, plus the skill
+# vocabulary. The next run compares against it to decide, per shard, whether
+# the partition can be kept as is, only needs the newly appended roles scored
+# into it, or must be rescored. Partitions store skill ids (LearningPaths,
+# Arrow Recommendations), so any vocabulary change rescores every shard.
+
+MANIFEST_PATH = "Manifest.json"
+ROLE_FINGERPRINTS_PATH = "Manifest.roles.npy"
+
+KEEP, EXTEND, RESCORE = "keep", "extend", "rescore"
+
+
+def fingerprint(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _row_fingerprints(keys, matrix, skill_names):
+    fps = np.empty(len(keys), dtype=np.uint64)
+    for i, key in enumerate(keys):
+        names = sorted(skill_names[matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]]])
+        fps[i] = fingerprint(key + "\x1f" + "\x1e".join(names))
+    return fps
+
+
+def employee_fingerprints(employee_ids, emp_matrix, skill_names):
+    return _row_fingerprints([str(e) for e in employee_ids], emp_matrix, skill_names)
+
+
+def role_fingerprints(role_ids, role_links, role_matrix, skill_names):
+    keys = [f"{role_id}\x1f{link}" for role_id, link in zip(role_ids, role_links)]
+    return _row_fingerprints(keys, role_matrix, skill_names)
+
+
+def load_manifest(directory="."):
+    path = os.path.join(directory, MANIFEST_PATH)
+    roles_path = os.path.join(directory, ROLE_FINGERPRINTS_PATH)
+    if not (os.path.exists(path) and os.path.exists(roles_path)):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest['role_fingerprints'] = np.load(roles_path)
+    return manifest
+
+
+def save_manifest(config, skill_names, employees, shards, employee_ids, employee_fps, role_fps, directory="."):
+    # employees: {employee_id: original_emp_id}, used to carry skill
+    # assignments over to the next run (see previous_employee_skills)
+    manifest = {
+        'config': config,
+        'skill_names': [str(name) for name in skill_names],
+        'employees': {str(k): str(v) for k, v in employees.items()},
+        'shards': [
+            {
+                'employee_ids': [str(e) for e in employee_ids[lo:hi]],
+                'fingerprints': [format(int(fp), "016x") for fp in employee_fps[lo:hi]],
+            }
+            for _, lo, hi in shards
+        ],
+    }
+    np.save(os.path.join(directory, ROLE_FINGERPRINTS_PATH), role_fps)
+    with open(os.path.join(directory, MANIFEST_PATH), "w") as f:
+        json.dump(manifest, f)
+
+
+def previous_employee_skills(manifest, directory="."):
+    # {(employee_id, original_emp_id): [skill names]} from the last run, so
+    # Step 4 can keep existing employees' skills stable across runs
+    if manifest is None:
+        return {}
+    try:
+        employee_skills_df = read_table("EmployeeSkills", directory=directory)
+    except FileNotFoundError:
+        return {}
+    names = manifest['skill_names']
+    previous = {}
+    for emp, skill_id in zip(employee_skills_df['employee_id'].astype(str), employee_skills_df['skill_id']):
+        original = manifest['employees'].get(emp)
+        if original is not None and 0 < skill_id <= len(names):
+            previous.setdefault((emp, original), []).append(names[skill_id - 1])
+    return previous
+
+
+def plan_shards(manifest, config, fmt, shards, employee_ids, employee_fps, role_fps, skill_names, directory="."):
+    # Returns ({shard_no: KEEP | EXTEND | RESCORE}, first appended role index or None, reason)
+    rescore_all = {shard_no: RESCORE for shard_no, _, _ in shards}
+    if manifest is None:
+        return rescore_all, None, "no previous manifest"
+    if manifest['config'] != config:
+        return rescore_all, None, "pipeline settings changed"
+    if manifest['skill_names'] != [str(name) for name in skill_names]:
+        # Kept partitions' skill ids would decode to the wrong skills
+        return rescore_all, None, "skill vocabulary changed"
+
+    old_role_fps = manifest['role_fingerprints']
+    n_old = len(old_role_fps)
+    if len(role_fps) < n_old or not np.array_equal(role_fps[:n_old], old_role_fps):
+        return rescore_all, None, "existing roles changed or were removed"
+    appended_from = n_old if len(role_fps) > n_old else None
+    if appended_from is not None and config['tie_break'] == "random":
+        # The random tie order is a permutation of all roles, so it shifts
+        # as soon as a role is added
+        return rescore_all, None, "roles added with random tie-breaking"
+    if appended_from is not None and config.get('scoring') == "idf":
+        # IDF weights are computed over all roles
+        return rescore_all, None, "roles added with IDF scoring"
+    if appended_from is not None and config.get('role_dedup') == "near":
+        # Appended postings can merge existing near-duplicate groups
+        return rescore_all, None, "roles added with near-duplicate role dedup"
+
+    plan = {}
+    old_shards = manifest['shards']
+    for shard_no, lo, hi in shards:
+        old = old_shards[shard_no] if shard_no < len(old_shards) else None
+        unchanged = (
+            old is not None
+            and old['employee_ids'] == [str(e) for e in employee_ids[lo:hi]]
+            and old['fingerprints'] == [format(int(fp), "016x") for fp in employee_fps[lo:hi]]
+            and os.path.exists(partition_path("Recommendations", fmt, shard_no, directory))
+            and os.path.exists(partition_path("LearningPaths", "jsonl", shard_no, directory))
+        )
+        if not unchanged:
+            plan[shard_no] = RESCORE
+        else:
+            plan[shard_no] = EXTEND if appended_from is not None else KEEP
+    return plan, appended_from, "incremental"
+
+
+def merge_appended_roles(old_df, new_df, employee_order, role_order, top_k=None, tie_rank=None):
+    # Combine a shard's previous rows with its rows for newly appended roles.
+    # Full mode: rows stay in (employee, role) order. Top-K mode: keep the
+    # best top_k per employee by (match_score, tie rank), like build_recommendations.
+    merged = pd.concat([old_df, new_df], ignore_index=True)
+    emp_pos = merged['employee_id'].astype(str).map(employee_order).to_numpy()
+    role_pos = merged['role_id'].astype(str).map(role_order).to_numpy()
+    if top_k is None:
+        order = np.lexsort((role_pos, emp_pos))
+        return merged.iloc[order].reset_index(drop=True)
+    order = np.lexsort((tie_rank[role_pos], -merged['match_score'].to_numpy(), emp_pos))
+    merged = merged.iloc[order]
+    return merged.groupby(emp_pos[order], sort=False).head(top_k).reset_index(drop=True)
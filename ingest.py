@@ -0,0 +1,104 @@
+import os
+import numpy as np
+import pandas as pd
+
+from vocabulary import SkillVocabulary, tokenize, group_by_row
+
+# =========================
+# Streaming ingestion of the source CSVs
+# =========================
+# job_skills.csv and job_postings.csv are read exactly once, in chunks whose
+# row count is derived from a memory budget. One pass over job_skills.csv
+# yields both the skill vocabulary and the job_link -> skill_id mapping, so
+# later steps never need to reload the file.
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# pandas holds each CSV byte as several bytes of Python objects once parsed
+# (strings, lists from str.split, exploded rows); leave room for that
+PARSE_OVERHEAD = 8
+MIN_CHUNK_ROWS = 1000
+
+
+def rows_per_chunk(path, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, sample_bytes=1 << 20):
+    # Estimate the average row size from the first MB of the file
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes)
+    n_lines = max(sample.count(b"\n"), 1)
+    bytes_per_row = max(len(sample) / n_lines, 1)
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    return max(MIN_CHUNK_ROWS, int(budget_bytes / (bytes_per_row * PARSE_OVERHEAD)))
+
+
+def _read_chunks(path, usecols, memory_budget_mb):
+    # Column names are stripped (the LinkedIn exports carry stray spaces)
+    header = pd.read_csv(path, nrows=0).columns
+    stripped = {col.strip(): col for col in header}
+    missing = [col for col in usecols if col not in stripped]
+    if missing:
+        raise ValueError(f"❌ {missing} column(s) missing in {os.path.basename(path)}")
+    chunks = pd.read_csv(
+        path,
+        usecols=[stripped[col] for col in usecols],
+        chunksize=rows_per_chunk(path, memory_budget_mb)
+    )
+    for chunk in chunks:
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def stream_job_skills(path="job_skills.csv", memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    # Returns (sorted unique skill names, {job_link: int32 array of skill_ids}),
+    # with skill_id = position in the sorted name list + 1 as in Skills.csv.
+    # Like a dict built row by row, a job_link listed twice keeps its last row.
+    vocab = {}
+    job_link_to_codes = {}
+    for chunk in _read_chunks(path, ["job_link", "job_skills"], memory_budget_mb):
+        chunk = chunk.reset_index(drop=True)
+        tokens = tokenize(chunk['job_skills'])
+
+        # Intern names: codes are assigned in first-seen order during the pass
+        for name in pd.unique(tokens):
+            if name not in vocab:
+                vocab[name] = len(vocab)
+        codes = tokens.map(vocab).to_numpy(dtype=np.int32)
+
+        # Split the flat code array back into one array per posting
+        for job_link, row_codes in zip(chunk['job_link'], group_by_row(codes, tokens.index, len(chunk))):
+            job_link_to_codes[job_link] = row_codes
+
+    skill_names = sorted(vocab)
+    code_to_id = np.empty(len(vocab), dtype=np.int32)
+    for skill_id, name in enumerate(skill_names, 1):
+        code_to_id[vocab[name]] = skill_id
+    for job_link, row_codes in job_link_to_codes.items():
+        job_link_to_codes[job_link] = code_to_id[row_codes]
+    return skill_names, job_link_to_codes
+
+
+def stream_job_postings(path="job_postings.csv", memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    # Unique (job_link, job_title) pairs in first-seen order, i.e. the same
+    # rows as job_postings[['job_link', 'job_title']].drop_duplicates()
+    seen = set()
+    links, titles = [], []
+    for chunk in _read_chunks(path, ["job_link", "job_title"], memory_budget_mb):
+        chunk = chunk[['job_link', 'job_title']].drop_duplicates()
+        for job_link, job_title in zip(chunk['job_link'], chunk['job_title']):
+            key = (job_link, job_title)
+            if key not in seen:
+                seen.add(key)
+                links.append(job_link)
+                titles.append(job_title)
+    return pd.DataFrame({'job_link': links, 'job_title': titles})
+
+
+def remap_skill_ids(job_link_to_skill_ids, source_skill_names, skills_df):
+    # Translate ids from stream_job_skills() into the ids of an existing
+    # Skills table by name; names absent from skills_df are dropped
+    name_to_id = SkillVocabulary.from_frame(skills_df).name_to_id
+    lookup = np.array([-1] + [name_to_id.get(name, -1) for name in source_skill_names], dtype=np.int64)
+    remapped = {}
+    for job_link, skill_ids in job_link_to_skill_ids.items():
+        ids = lookup[skill_ids]
+        remapped[job_link] = ids[ids >= 0].astype(np.int32)
+    return remapped
@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+# =========================
+# Lightweight stage instrumentation
+# =========================
+# A Profiler records, per named stage: wall time, current and peak RSS,
+# optionally the tracemalloc peak (Python allocations only, costs ~2x in
+# allocation-heavy code, so it is off by default), and any row counters the
+# stage reports. Every record is emitted as one JSON object on the "profile"
+# logger and, with a log path, appended to a JSON Lines file.
+#
+#   profiler = Profiler("genratedata", log_path="Profile.jsonl")
+#   with profiler.stage("skills") as stage:
+#       ...
+#       stage.count(rows=len(skills_df))
+
+logger = logging.getLogger("profile")
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb():
+    # Resident set size right now; falls back to the peak where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.counters = {}
+        self.traced_peak = 0
+        self.start = None
+
+    def count(self, **counters):
+        for key, n in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + int(n)
+
+
+class Profiler:
+    def __init__(self, source, log_path=None, trace_memory=False):
+        self.source = source
+        self.log_path = log_path
+        self.trace_memory = trace_memory
+        self.run = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.records = []
+        self._open = []
+        self._checkpoint = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _start(self, name):
+        stage = Stage(name)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._open.append(stage)
+        stage.start = time.perf_counter()
+        return stage
+
+    def _stop(self, stage):
+        seconds = time.perf_counter() - stage.start
+        self._open.remove(stage)
+        if self.trace_memory:
+            # reset_peak() in nested stages hides their allocations from
+            # this stage's own peak, so they report it upwards
+            stage.traced_peak = max(stage.traced_peak, tracemalloc.get_traced_memory()[1])
+            if self._open:
+                self._open[-1].traced_peak = max(self._open[-1].traced_peak, stage.traced_peak)
+        self._emit(stage.name, seconds, stage.counters, stage.traced_peak)
+
+    @contextmanager
+    def stage(self, name):
+        stage = self._start(name)
+        try:
+            yield stage
+        finally:
+            self._stop(stage)
+
+    def checkpoint(self, name):
+        # Ends the previous checkpoint stage (if any) and starts `name`; for
+        # straight-line scripts such as app.py where a `with` block per
+        # section would re-indent the whole file. Plain start/stop state, so a
+        # checkpoint left open (the script raised or called st.stop()) is
+        # simply never recorded
+        self.finish()
+        self._checkpoint = self._start(name)
+        return self._checkpoint
+
+    def finish(self):
+        if self._checkpoint is not None:
+            checkpoint, self._checkpoint = self._checkpoint, None
+            self._stop(checkpoint)
+
+    def record(self, name, seconds, **counters):
+        # A stage timed elsewhere, e.g. in a worker process
+        self._emit(name, seconds, {k: int(v) for k, v in counters.items()}, 0)
+
+    def _emit(self, name, seconds, counters, traced_peak):
+        entry = {
+            'source': self.source,
+            'run': self.run,
+            'stage': name,
+            'seconds': round(seconds, 4),
+            **counters,
+            'rss_mb': round(current_rss_mb(), 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        if 'rows' in counters:
+            entry['rows_per_sec'] = round(counters['rows'] / seconds, 1) if seconds > 0 else None
+        if self.trace_memory:
+            entry['traced_peak_mb'] = round(traced_peak / (1024 * 1024), 1)
+        self.records.append(entry)
+
+        line = json.dumps(entry)
+        logger.info(line)
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(line + "\n")
+
+    def summary(self):
+        # One row per stage; the usual columns first, then any other counters
+        df = pd.DataFrame(self.records).drop(columns=['source', 'run'], errors='ignore')
+        first = [c for c in ['stage', 'seconds', 'rows', 'rows_per_sec'] if c in df.columns]
+        return df[first + [c for c in df.columns if c not in first]]
@@ -0,0 +1,134 @@
+import json
+import os
+
+from artifacts import partition_path, read_table
+from vocabulary import SkillVocabulary
+
+# =========================
+# Compact learning paths (normalized, streamed, lazily expanded)
+# =========================
+# LearningPaths.resources.json  skill_id -> curated resources, stored once
+# LearningPaths.jsonl           one line per employee-role pair:
+#                               {"employee_id", "role_id", "match_score", "missing_skill_ids"}
+# LearningPaths.index.json      employee_id -> [byte offset, byte length] in the .jsonl
+#
+# Shards write their own .jsonl partition plus index; the merge step
+# concatenates them. LearningPathStore reads back one employee at a time
+# and expands skill ids into {skill name: resources} only on request.
+
+SKILL_RESOURCES = {
+    "Python": ["https://www.w3schools.com/python/", "https://www.kaggle.com/learn/python"],
+    "SQL": ["https://www.sqlbolt.com/", "https://mode.com/sql-tutorial/"],
+    "Machine Learning": ["https://www.coursera.org/learn/machine-learning", "https://scikit-learn.org/"],
+    "Excel": ["https://exceljet.net/", "https://www.udemy.com/course/excel-for-beginners/"],
+    "Tableau": ["https://public.tableau.com/en-us/s/resources", "https://www.datacamp.com/courses/tableau-fundamentals"]
+    # 🔹 Add more as needed
+}
+NO_RESOURCE = ["No resource found (add manually)"]
+
+PATHS_FILE = "LearningPaths.jsonl"
+INDEX_FILE = "LearningPaths.index.json"
+RESOURCES_FILE = "LearningPaths.resources.json"
+
+
+def write_resources(skills_df, directory="."):
+    skillname_to_id = SkillVocabulary.from_frame(skills_df).name_to_id
+    table = {
+        str(skillname_to_id[name]): resources
+        for name, resources in SKILL_RESOURCES.items()
+        if name in skillname_to_id
+    }
+    with open(os.path.join(directory, RESOURCES_FILE), "w") as f:
+        json.dump({"default": NO_RESOURCE, "skills": table}, f, indent=4)
+
+
+def write_partition(recommendations_df, shard_no, vocabulary, directory="."):
+    # Rows arrive grouped by employee (Step 5 order), so each employee's
+    # lines form one contiguous byte range. The missing skill ids from the
+    # scoring step are reused when present; otherwise the strings are encoded.
+    if 'missing_skill_ids' in recommendations_df.columns:
+        missing_ids = recommendations_df['missing_skill_ids']
+    else:
+        missing_ids = vocabulary.encode(recommendations_df['missing_skills'])
+    index = {}
+    offset = 0
+    with open(partition_path("LearningPaths", "jsonl", shard_no, directory), "wb") as f:
+        for emp, role_id, match_score, skill_ids in zip(
+            recommendations_df['employee_id'].astype(str),
+            recommendations_df['role_id'].astype(str),
+            recommendations_df['match_score'].tolist(),
+            missing_ids
+        ):
+            line = json.dumps({
+                "employee_id": emp,
+                "role_id": role_id,
+                "match_score": match_score,
+                "missing_skill_ids": [int(s) for s in skill_ids]
+            }, separators=(",", ":")).encode("utf-8") + b"\n"
+            start, length = index.get(emp, (offset, 0))
+            index[emp] = (start, length + len(line))
+            f.write(line)
+            offset += len(line)
+    with open(partition_path("LearningPaths", "index.json", shard_no, directory), "w") as f:
+        json.dump(index, f)
+
+
+def merge_partitions(n_shards, directory="."):
+    index = {}
+    base = 0
+    with open(os.path.join(directory, PATHS_FILE), "wb") as out:
+        for shard_no in range(n_shards):
+            with open(partition_path("LearningPaths", "index.json", shard_no, directory)) as f:
+                for emp, (start, length) in json.load(f).items():
+                    index[emp] = [base + start, length]
+            with open(partition_path("LearningPaths", "jsonl", shard_no, directory), "rb") as f:
+                data = f.read()
+            out.write(data)
+            base += len(data)
+    with open(os.path.join(directory, INDEX_FILE), "w") as f:
+        json.dump(index, f)
+
+
+class LearningPathStore:
+    def __init__(self, directory=".", skills_df=None):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        with open(os.path.join(directory, RESOURCES_FILE)) as f:
+            resources = json.load(f)
+        self.default_resources = resources["default"]
+        self.resources = {int(k): v for k, v in resources["skills"].items()}
+        if skills_df is None:
+            skills_df = read_table("Skills", directory=directory)
+        self.id_to_skillname = SkillVocabulary.from_frame(skills_df).id_to_name
+
+    def records(self, employee_id):
+        # Compact records for one employee: a single seek + read
+        if employee_id not in self.index:
+            return []
+        start, length = self.index[employee_id]
+        with open(os.path.join(self.directory, PATHS_FILE), "rb") as f:
+            f.seek(start)
+            data = f.read(length)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def expand(self, employee_id, role_id=None):
+        # Same shape as the old LearningPaths.json entries
+        paths = []
+        for rec in self.records(employee_id):
+            if role_id is not None and rec["role_id"] != role_id:
+                continue
+            paths.append({
+                "employee_id": rec["employee_id"],
+                "role_id": rec["role_id"],
+                "match_score": rec["match_score"],
+                "learning_path": self.resources_for(rec["missing_skill_ids"])
+            })
+        return paths
+
+    def resources_for(self, skill_ids):
+        # {skill name: resources} for a list of (missing) skill ids
+        return {
+            self.id_to_skillname[int(s)]: self.resources.get(int(s), self.default_resources)
+            for s in skill_ids
+        }
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from vocabulary import SkillVocabulary
+
+# =========================
+# Indexed lookups for the dashboard
+# =========================
+# Built once per dataset version, so selecting an employee costs O(rows
+# returned) instead of a boolean mask over every row of every table:
+#   - employees / roles / skills: dict from id to row position
+#   - EmployeeSkills and Recommendations: rows grouped by employee
+#     (Recommendations pre-sorted by match_score, best first) with
+#     per-employee [start, end) offsets into that order
+#   - employee x skill matrix (CSR) for the heatmap: only the selected
+#     employees / skills are ever densified
+
+
+def _group_offsets(keys, *sort_keys):
+    # Positions of `keys` ordered by key (then by sort_keys), plus
+    # {key: (start, end)} into that order
+    codes, uniques = pd.factorize(keys, sort=False)
+    order = np.lexsort(tuple(reversed(sort_keys)) + (codes,))
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(uniques)))])
+    offsets = {key: (bounds[i], bounds[i + 1]) for i, key in enumerate(uniques)}
+    return order, offsets
+
+
+class DatasetLookup:
+    def __init__(self, employees_df, roles_df, recommendations_df, employee_skills_df, skills_df):
+        self.employees_df = employees_df
+        self.recommendations_df = recommendations_df
+        self.employee_pos = {emp: i for i, emp in enumerate(employees_df['employee_id'].astype(str))}
+        self.role_names = dict(zip(roles_df['role_id'].astype(str), roles_df['role_name']))
+
+        self.vocabulary = SkillVocabulary.from_frame(skills_df)
+        self.skill_names = self.vocabulary.names
+        self.skill_pos = self.vocabulary.id_to_col
+
+        emp_skill_order, self.emp_skill_offsets = _group_offsets(employee_skills_df['employee_id'])
+        self.emp_skill_ids = employee_skills_df['skill_id'].to_numpy()[emp_skill_order]
+
+        # Same counts as employee_skills_df.pivot_table(index='employee_id',
+        # columns='skill_id', aggfunc='size'): rows are employees with at least
+        # one skill (sorted), columns are skills held by at least one employee
+        matrix_rows, self.matrix_employees = pd.factorize(employee_skills_df['employee_id'], sort=True)
+        matrix_cols = employee_skills_df['skill_id'].map(self.skill_pos)
+        known = matrix_cols.notna().to_numpy()
+        matrix_cols = matrix_cols[known].astype(int).to_numpy()
+        self.skill_matrix = sparse.csr_matrix(
+            (np.ones(len(matrix_cols), dtype=np.int64), (matrix_rows[known], matrix_cols)),
+            shape=(len(self.matrix_employees), len(self.skill_names))
+        )
+        self.matrix_row = {emp: i for i, emp in enumerate(self.matrix_employees)}
+        held = np.flatnonzero(np.bincount(matrix_cols, minlength=len(self.skill_names)))
+        self.matrix_col = {self.skill_names[i]: i for i in held}
+
+        # Stable lexsort: equal scores keep their file order
+        self.rec_order, self.rec_offsets = _group_offsets(
+            recommendations_df['employee_id'],
+            -recommendations_df['match_score'].to_numpy()
+        )
+
+    def employee(self, employee_id):
+        return self.employees_df.iloc[self.employee_pos[employee_id]]
+
+    def employee_skill_names(self, employee_id):
+        # In Skills table order, like skills_df[skills_df['skill_id'].isin(...)]
+        start, end = self.emp_skill_offsets.get(employee_id, (0, 0))
+        positions = sorted(self.skill_pos[s] for s in self.emp_skill_ids[start:end] if s in self.skill_pos)
+        return self.skill_names[positions].tolist()
+
+    def top_recommendations(self, employee_id, k=5):
+        start, end = self.rec_offsets.get(employee_id, (0, 0))
+        return self.recommendations_df.iloc[self.rec_order[start:min(end, start + k)]]
+
+    def skill_matrix_frame(self, employee_ids, skill_names):
+        # Dense employee x skill counts for just the selection, like
+        # pivot_df.loc[pivot_df.index.intersection(employee_ids)][skill_names]
+        # (unknown employees / skills are dropped)
+        rows = sorted(self.matrix_row[e] for e in set(employee_ids) if e in self.matrix_row)
+        cols = [self.matrix_col[s] for s in skill_names if s in self.matrix_col]
+        dense = self.skill_matrix[rows][:, cols].toarray()
+        return pd.DataFrame(
+            dense,
+            index=pd.Index(self.matrix_employees[rows], name='employee_id'),
+            columns=self.skill_names[cols]
+        )
+
+    def role_name(self, role_id, default=None):
+        return self.role_names.get(str(role_id), default)
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+from scoring import encode_roles, role_tie_rank, split_skill_strings, MatchScorer
+from vocabulary import SkillVocabulary
+from ingest import stream_job_skills, remap_skill_ids
+
+# =========================
+# Inverted skill -> role index for on-demand recommendations
+# =========================
+# postings row j lists every role that requires skill column j. Scoring a
+# skill set only touches the posting lists of those skills: the match_score
+# of a role is the number of times it appears across them (or, for the
+# normalized scoring modes, the weighted sum normalized as in scoring.py).
+# Roles that share no skill with the query are never visited.
+
+
+def build_role_index(roles_df, skills_df, job_skills_path="job_skills.csv", tie_break="role_order"):
+    # RoleIndex over the generated Roles / Skills tables; role skill lists
+    # come from the source job_skills.csv (FileNotFoundError without it)
+    source_skill_names, job_link_to_skill_ids = stream_job_skills(job_skills_path)
+    job_link_to_skill_ids = remap_skill_ids(job_link_to_skill_ids, source_skill_names, skills_df)
+    # Every role also requires "Python", as in genratedata.py Step 5
+    python_ids = skills_df.loc[skills_df['skill_name'] == "Python", 'skill_id']
+    required_skill_id = python_ids.iloc[0] if not python_ids.empty else None
+    return RoleIndex(roles_df, skills_df, job_link_to_skill_ids, required_skill_id, tie_break)
+
+
+class RoleIndex:
+    def __init__(self, roles_df, skills_df, job_link_to_skill_ids, required_skill_id=None, tie_break="role_order"):
+        self.vocabulary = SkillVocabulary.from_frame(skills_df)
+        self.skill_names, self.skill_id_to_col = self.vocabulary.names, self.vocabulary.id_to_col
+        self.role_ids = roles_df['role_id'].astype(str).to_numpy()
+        self.role_names = roles_df['role_name'].astype(str).to_numpy()
+        self.tie_break = tie_break
+        self.role_matrix = encode_roles(
+            roles_df['role_external_link'].tolist(),
+            job_link_to_skill_ids,
+            self.skill_id_to_col,
+            required_skill_id
+        )
+        self.postings = self.role_matrix.T.tocsr()
+        # The required skill gets weight 0 in the normalized scoring modes
+        required_col = self.skill_id_to_col.get(required_skill_id)
+        self.ignore_cols = [required_col] if required_col is not None else []
+        self._scorers = {}
+        self.tie_rank = role_tie_rank(self.role_matrix, tie_break)
+        self.tie_order = np.argsort(self.tie_rank)
+
+    @property
+    def n_roles(self):
+        return len(self.role_ids)
+
+    def skill_ids_for_names(self, skill_names):
+        return self.vocabulary.ids_for_names(skill_names)
+
+    def scorer(self, scoring="count"):
+        if scoring not in self._scorers:
+            self._scorers[scoring] = MatchScorer(self.role_matrix, scoring, self.ignore_cols)
+        return self._scorers[scoring]
+
+    def _query_columns(self, skill_ids):
+        cols = {self.skill_id_to_col[s] for s in skill_ids if s in self.skill_id_to_col}
+        return np.fromiter(sorted(cols), dtype=np.int64, count=len(cols))
+
+    def _hit_scores(self, cols, scorer):
+        # (roles sharing a skill with the query, their match scores)
+        if not len(cols):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        posting = self.postings[cols]
+        if scorer.weights is None:
+            roles, counts = np.unique(posting.indices, return_counts=True)
+            return roles, counts.astype(np.int32)
+        hit_weights = np.repeat(scorer.weights[cols], np.diff(posting.indptr))
+        roles, inverse = np.unique(posting.indices, return_inverse=True)
+        overlap = np.bincount(inverse, weights=hit_weights, minlength=len(roles))
+        emp_norm = scorer.weights[cols].sum()
+        return roles, scorer.quantize(overlap, emp_norm, scorer.role_norms[roles], scorer.inv_role_norms[roles])
+
+    def _batch_hit_scores(self, query_cols, scorer):
+        # _hit_scores for several queries from one gather over the posting
+        # lists: (query of each hit, role, score), grouped by query
+        cols = np.concatenate(query_cols) if query_cols else np.empty(0, dtype=np.int64)
+        posting = self.postings[cols]
+        lengths = np.diff(posting.indptr)
+        queries = np.repeat(np.repeat(np.arange(len(query_cols)), [len(c) for c in query_cols]), lengths)
+        keys, inverse = np.unique(queries * self.n_roles + posting.indices, return_inverse=True)
+        if scorer.weights is None:
+            scores = np.bincount(inverse, minlength=len(keys)).astype(np.int32)
+        else:
+            overlap = np.bincount(inverse, weights=np.repeat(scorer.weights[cols], lengths), minlength=len(keys))
+            emp_norms = np.array([scorer.weights[c].sum() for c in query_cols])
+            roles = keys % self.n_roles
+            scores = scorer.quantize(overlap, emp_norms[keys // self.n_roles],
+                                     scorer.role_norms[roles], scorer.inv_role_norms[roles])
+        return keys // self.n_roles, keys % self.n_roles, scores
+
+    def top_role_indices(self, skill_ids, k=5, scoring="count"):
+        # Returns (role indices best first, their match scores)
+        scorer = self.scorer(scoring)
+        roles, scores = self._hit_scores(self._query_columns(skill_ids), scorer)
+        return self._best_roles(roles, scores, k, scorer)
+
+    def _best_roles(self, roles, scores, k, scorer):
+        # Hits that still score 0 (zero-weight skills only) rank like any
+        # other zero-score role, i.e. in tie order via the padding below
+        roles, scores = roles[scores > 0], scores[scores > 0]
+
+        k = min(k, self.n_roles)
+        if len(roles) > k:
+            key = scores.astype(np.int64) * self.n_roles + (self.n_roles - 1 - self.tie_rank[roles])
+            best = np.argpartition(-key, k - 1)[:k]
+            roles, scores = roles[best], scores[best]
+        key = scores.astype(np.int64) * self.n_roles + (self.n_roles - 1 - self.tie_rank[roles])
+        order = np.argsort(-key)
+        roles, scores = roles[order], scores[order]
+
+        # Fewer than k roles share a skill: pad with zero-score roles in tie order
+        if len(roles) < k:
+            seen = set(roles.tolist())
+            pad = []
+            for r in self.tie_order:
+                if r not in seen:
+                    pad.append(r)
+                    if len(roles) + len(pad) == k:
+                        break
+            roles = np.concatenate([roles, np.asarray(pad, dtype=roles.dtype)])
+            scores = np.concatenate([scores, np.zeros(len(pad), dtype=scores.dtype)])
+        return roles, scorer.match_scores(scores)
+
+    def skill_mask(self, skill_ids):
+        # Boolean mask over the skill columns, like one employee row
+        emp_mask = np.zeros(len(self.skill_names), dtype=bool)
+        emp_mask[self._query_columns(skill_ids)] = True
+        return emp_mask
+
+    def role_scores(self, skill_ids, roles, scoring="count"):
+        # Match scores of one skill set against the given role indices
+        scorer = self.scorer(scoring)
+        hit_roles, hit_scores = self._hit_scores(self._query_columns(skill_ids), scorer)
+        roles = np.asarray(roles, dtype=np.int64)
+        scores = np.zeros(len(roles), dtype=np.int32)
+        pos = np.minimum(np.searchsorted(hit_roles, roles), max(len(hit_roles) - 1, 0))
+        if len(hit_roles):
+            found = hit_roles[pos] == roles
+            scores[found] = hit_scores[pos[found]]
+        return scorer.match_scores(scores)
+
+    def _roles_frame(self, skill_ids, roles, scores):
+        matched, missing = split_skill_strings(self.skill_mask(skill_ids), self.role_matrix, self.skill_names, roles)
+        return pd.DataFrame({
+            'role_id': self.role_ids[roles],
+            'match_score': scores,
+            'matched_skills': matched,
+            'missing_skills': missing
+        })
+
+    def top_roles(self, skill_ids, k=5, scoring="count"):
+        # Same columns as Recommendations.csv (minus employee_id)
+        roles, scores = self.top_role_indices(skill_ids, k, scoring)
+        return self._roles_frame(skill_ids, roles, scores)
+
+    def top_roles_batch(self, skill_id_sets, k=5, scoring="count"):
+        # top_roles for several skill sets at once: their posting lists are
+        # gathered and counted in one pass (used by service.py to answer
+        # concurrent queries together)
+        if not skill_id_sets:
+            return []
+        scorer = self.scorer(scoring)
+        query_cols = [self._query_columns(skill_ids) for skill_ids in skill_id_sets]
+        queries, roles, scores = self._batch_hit_scores(query_cols, scorer)
+        bounds = np.searchsorted(queries, np.arange(len(query_cols) + 1))
+        frames = []
+        for i, skill_ids in enumerate(skill_id_sets):
+            lo, hi = bounds[i], bounds[i + 1]
+            best, best_scores = self._best_roles(roles[lo:hi], scores[lo:hi], k, scorer)
+            frames.append(self._roles_frame(skill_ids, best, best_scores))
+        return frames
@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from vocabulary import LIST_SEPARATOR
+
+# =========================
+# Sparse scoring engine for employee-role matching
+# =========================
+# Employees and roles are encoded as binary (0/1) CSR matrices over the
+# skill_id vocabulary from Skills.csv. Row i of the product
+# employees @ roles.T then holds the match_score of employee i against
+# every role, so one sparse product replaces the nested iterrows() loop.
+#
+# Scoring modes (MatchScorer):
+#   count    - number of matched skills (the original match_score)
+#   coverage - share of the role's required skills the employee has
+#   jaccard  - matched / (employee skills + role skills - matched)
+#   idf      - coverage with each skill weighted by its rarity across the
+#              roles, log((1 + n_roles) / (1 + roles requiring it))
+# The normalized modes are scaled into the same sparse product (skill
+# weights are folded into the role matrix once). Internally they are kept as
+# int32 in units of 10**-SCORE_DECIMALS, so ranking stays an integer
+# argpartition, and only the selected scores become floats. Normalizing
+# touches only the non-zero entries of the (sparse) product, so it adds
+# little on top of the count score. Skills passed as ignore_cols (the "Python" appended to
+# every role) get weight 0 there, so they no longer shift every score.
+
+# Employees per scoring chunk are derived from a memory budget: each chunk
+# holds chunk x n_roles dense int32 scores, plus an int64 ranking key and the
+# int64 argpartition indices in top-K mode. The budget is per worker process.
+DEFAULT_SCORING_MEMORY_MB = 256
+SCORE_BYTES_PER_CELL = 4 + 8 + 8
+
+SCORING_MODES = ("count", "coverage", "jaccard", "idf")
+SCORE_DECIMALS = 4
+
+
+def _binary_csr(rows, cols, n_rows, n_cols):
+    data = np.ones(len(rows), dtype=np.int32)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n_rows, n_cols), dtype=np.int32)
+    # Duplicate (row, col) entries are summed on conversion; clamp back to 0/1
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    matrix.sort_indices()
+    return matrix
+
+
+def encode_employees(employee_ids, employee_skills_df, id_to_col):
+    row_of = {emp: i for i, emp in enumerate(employee_ids)}
+    rows = employee_skills_df['employee_id'].map(row_of)
+    cols = employee_skills_df['skill_id'].map(id_to_col)
+    keep = rows.notna() & cols.notna()
+    return _binary_csr(
+        rows[keep].to_numpy(dtype=np.int64),
+        cols[keep].to_numpy(dtype=np.int64),
+        len(employee_ids),
+        len(id_to_col)
+    )
+
+
+def encode_roles(role_links, job_link_to_skill_ids, id_to_col, required_skill_id=None):
+    # job_link_to_skill_ids: {job_link: array of skill_ids} (see ingest.stream_job_skills).
+    # required_skill_id is added to every role that has a job_skills entry,
+    # matching how Recommendations.csv has always been generated.
+    # Skill ids outside the vocabulary can never be matched by an employee,
+    # so they carry no weight in the score and are dropped here.
+    empty = np.empty(0, dtype=np.int64)
+    role_skill_ids = [job_link_to_skill_ids.get(job_link) for job_link in role_links]
+    has_entry = np.fromiter((ids is not None for ids in role_skill_ids), dtype=bool, count=len(role_links))
+    role_skill_ids = [empty if ids is None else ids for ids in role_skill_ids]
+    lengths = np.fromiter(map(len, role_skill_ids), dtype=np.int64, count=len(role_links))
+
+    rows = np.repeat(np.arange(len(role_links), dtype=np.int64), lengths)
+    ids = np.concatenate(role_skill_ids).astype(np.int64) if role_skill_ids else empty
+    if required_skill_id is not None:
+        required_rows = np.flatnonzero(has_entry)
+        rows = np.concatenate([rows, required_rows])
+        ids = np.concatenate([ids, np.full(len(required_rows), required_skill_id, dtype=np.int64)])
+
+    # Vectorized skill_id -> column lookup
+    max_id = max(max(id_to_col, default=0), int(ids.max(initial=0)))
+    lookup = np.full(max_id + 1, -1, dtype=np.int64)
+    lookup[np.fromiter(id_to_col.keys(), dtype=np.int64)] = np.fromiter(id_to_col.values(), dtype=np.int64)
+    cols = lookup[ids]
+    keep = cols >= 0
+    return _binary_csr(rows[keep], cols[keep], len(role_links), len(id_to_col))
+
+
+def skill_weights(role_matrix, scoring="count", ignore_cols=None):
+    # Weight per skill column; None for count (plain 0/1 product)
+    if scoring not in SCORING_MODES:
+        raise ValueError(f"❌ Unknown scoring mode '{scoring}', expected one of {SCORING_MODES}")
+    if scoring == "count":
+        return None
+    n_cols = role_matrix.shape[1]
+    if scoring == "idf":
+        # Document frequency over roles that list any skill
+        n_roles = np.count_nonzero(np.diff(role_matrix.indptr))
+        role_freq = np.bincount(role_matrix.indices, minlength=n_cols)
+        weights = np.log((1 + n_roles) / (1 + role_freq))
+    else:
+        weights = np.ones(n_cols)
+    if ignore_cols is not None:
+        weights[np.asarray(ignore_cols, dtype=np.int64)] = 0
+    return weights
+
+
+class MatchScorer:
+    def __init__(self, role_matrix, scoring="count", ignore_cols=None, weight_matrix=None):
+        # weight_matrix: roles the IDF weights are counted over, when
+        # role_matrix is only a subset of them (e.g. the canonical roles)
+        self.scoring = scoring
+        self.weights = skill_weights(role_matrix if weight_matrix is None else weight_matrix, scoring, ignore_cols)
+        role_t = role_matrix.T.tocsc()
+        if self.weights is None:
+            self.role_t = role_t
+        else:
+            # Weighted overlap = employees @ diag(weights) @ roles.T
+            self.role_t = (sparse.diags(self.weights) @ role_t).tocsc()
+            self.role_norms = role_matrix @ self.weights
+            self.inv_role_norms = np.divide(1.0, self.role_norms, out=np.zeros_like(self.role_norms),
+                                            where=self.role_norms > 0)
+
+    def scores(self, emp_chunk):
+        # Dense (employees x roles) int32 scores for a chunk of employee rows
+        overlap = (emp_chunk @ self.role_t).tocsr()
+        if self.weights is None:
+            return np.asarray(overlap.todense(), dtype=np.int32)
+        rows = np.repeat(np.arange(overlap.shape[0]), np.diff(overlap.indptr))
+        cols = overlap.indices
+        overlap.data = self.quantize(
+            overlap.data, (emp_chunk @ self.weights)[rows], self.role_norms[cols], self.inv_role_norms[cols]
+        )
+        return overlap.toarray()
+
+    def pair_scores(self, emp_chunk, emp_rows, roles):
+        # int32 scores of only the (emp_rows[i], roles[i]) pairs of a chunk
+        overlap = np.asarray(emp_chunk[emp_rows].multiply(self.role_t.T.tocsr()[roles]).sum(axis=1)).ravel()
+        if self.weights is None:
+            return overlap.astype(np.int32)
+        return self.quantize(
+            overlap, (emp_chunk @ self.weights)[emp_rows], self.role_norms[roles], self.inv_role_norms[roles]
+        )
+
+    def quantize(self, overlap, emp_norms, role_norms, inv_role_norms):
+        # Element-wise: overlap = weighted matched skills, *_norms = weighted
+        # skill set sizes of the employee / role of each entry
+        if self.scoring == "jaccard":
+            denom = emp_norms + role_norms - overlap
+            ratio = np.divide(overlap, denom, out=np.zeros(len(overlap)), where=denom > 0)
+        else:
+            ratio = overlap * inv_role_norms
+        return np.rint(ratio * 10 ** SCORE_DECIMALS).astype(np.int32)
+
+    def match_scores(self, scores):
+        # int32 scores -> match_score values (counts, or floats rounded to SCORE_DECIMALS)
+        if self.weights is None:
+            return scores
+        return scores / 10 ** SCORE_DECIMALS
+
+
+def score_chunk_rows(n_roles, memory_budget_mb=DEFAULT_SCORING_MEMORY_MB):
+    # Employees scored per chunk so chunk x n_roles stays within the budget
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget_bytes // (max(n_roles, 1) * SCORE_BYTES_PER_CELL)))
+
+
+TIE_BREAK_MODES = ("role_order", "fewest_missing", "random")
+
+
+def role_tie_rank(role_matrix, tie_break="role_order", seed=42):
+    # Rank 0 is the role preferred when two roles have the same match_score
+    n_roles = role_matrix.shape[0]
+    if tie_break == "role_order":
+        order = np.arange(n_roles)
+    elif tie_break == "fewest_missing":
+        # Equal score + fewer required skills = fewer missing skills
+        role_sizes = np.diff(role_matrix.indptr)
+        order = np.argsort(role_sizes, kind="stable")
+    elif tie_break == "random":
+        order = np.random.default_rng(seed).permutation(n_roles)
+    else:
+        raise ValueError(f"❌ Unknown tie_break '{tie_break}', expected one of {TIE_BREAK_MODES}")
+    rank = np.empty(n_roles, dtype=np.int64)
+    rank[order] = np.arange(n_roles)
+    return rank
+
+
+def top_k_indices(scores, k, tie_rank):
+    # Best k role indices per row, best first, using argpartition on a single
+    # int64 key (score first, tie rank second) so ties are broken exactly.
+    # The key is built negated and in place (ascending = best first), so
+    # only one chunk x n_roles int64 array is allocated besides the indices
+    n_roles = scores.shape[1]
+    k = min(k, n_roles)
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    key = scores.astype(np.int64)
+    key *= -n_roles
+    key -= n_roles - 1 - tie_rank
+    top = np.argpartition(key, k - 1, axis=1)[:, :k]
+    top_keys = np.take_along_axis(key, top, axis=1)
+    return np.take_along_axis(top, np.argsort(top_keys, axis=1), axis=1)
+
+
+def split_skill_columns(emp_row_mask, role_matrix, role_idx):
+    # For one employee, split each selected role's skill columns into matched / missing
+    indices = role_matrix.indices
+    indptr = role_matrix.indptr
+    matched, missing = [], []
+    for r in role_idx:
+        role_cols = indices[indptr[r]:indptr[r + 1]]
+        role_hit = emp_row_mask[role_cols]
+        matched.append(role_cols[role_hit])
+        missing.append(role_cols[~role_hit])
+    return matched, missing
+
+
+def split_skill_strings(emp_row_mask, role_matrix, skill_names, role_idx):
+    # Same split, as comma-joined skill names
+    matched, missing = split_skill_columns(emp_row_mask, role_matrix, role_idx)
+    return (
+        [LIST_SEPARATOR.join(skill_names[cols]) for cols in matched],
+        [LIST_SEPARATOR.join(skill_names[cols]) for cols in missing]
+    )
+
+
+def _expand(values, inverse):
+    # Per-unique-row values -> per-posting values
+    return values if inverse is None else [values[i] for i in inverse]
+
+
+def build_recommendations(employee_ids, role_ids, emp_matrix, role_matrix, skill_names,
+                          chunk_size=None, top_k=None, tie_break="role_order", seed=42,
+                          verbose=True, skill_ids=None, scorer=None, groups=None, retriever=None):
+    # top_k=None keeps every (employee, role) pair in role order; otherwise only
+    # the top_k best roles per employee are kept, best first. With skill_ids
+    # (the vocabulary's id per column), matched_skill_ids / missing_skill_ids
+    # int arrays are added next to the strings so later stages need not re-parse them.
+    # scorer: a MatchScorer over role_matrix (default: count scores).
+    # groups: a canonical_roles.RoleGroups; scores and skill splits are then
+    # computed once per canonical role (the scorer must be built over
+    # groups.role_matrix) and copied to every member posting.
+    # retriever: an ann_index.RoleLSHIndex over the scored rows; only its
+    # candidate roles are scored (requires top_k), see ann_index.py.
+    employee_ids = np.asarray(employee_ids)
+    role_ids = np.asarray(role_ids)
+    all_roles = np.arange(len(role_ids))
+    score_matrix = role_matrix if groups is None else groups.role_matrix
+    scorer = scorer or MatchScorer(score_matrix)
+    # chunk_size=None: as many employees as DEFAULT_SCORING_MEMORY_MB allows
+    chunk_size = chunk_size or score_chunk_rows(score_matrix.shape[0])
+    if retriever is not None and top_k is None:
+        raise ValueError("❌ Approximate role search needs top_k")
+    tie_rank = role_tie_rank(role_matrix, tie_break, seed) if top_k is not None else None
+    selector = groups.top_k_selector(tie_rank, top_k) if groups is not None and top_k is not None else None
+    frames = []
+    for start in range(0, emp_matrix.shape[0], chunk_size):
+        emp_chunk = emp_matrix[start:start + chunk_size]
+        top_scores = None
+        if retriever is not None:
+            top, top_scores = retriever.top_k(emp_chunk, scorer, top_k, tie_rank, selector)
+        else:
+            scores = scorer.scores(emp_chunk)
+            if top_k is None:
+                top = None
+            elif selector is not None:
+                top = selector.top_k(scores)
+            else:
+                top = top_k_indices(scores, top_k, tie_rank)
+        for offset in range(emp_chunk.shape[0]):
+            role_idx = top[offset] if top is not None else all_roles
+            # Rows of score_matrix for these postings; split each distinct one once
+            score_rows = role_idx if groups is None else groups.canon_of[role_idx]
+            row_scores = top_scores[offset] if top_scores is not None else scores[offset][score_rows]
+            split_rows, inverse = score_rows, None
+            if groups is not None:
+                split_rows, inverse = np.unique(score_rows, return_inverse=True)
+            emp_row = emp_matrix[start + offset]
+            emp_mask = np.zeros(emp_matrix.shape[1], dtype=bool)
+            emp_mask[emp_row.indices] = True
+            matched, missing = split_skill_columns(emp_mask, score_matrix, split_rows)
+            frame = {
+                'employee_id': np.repeat(employee_ids[start + offset], len(role_idx)),
+                'role_id': role_ids[role_idx],
+                'match_score': scorer.match_scores(row_scores),
+                'matched_skills': _expand([LIST_SEPARATOR.join(skill_names[cols]) for cols in matched], inverse),
+                'missing_skills': _expand([LIST_SEPARATOR.join(skill_names[cols]) for cols in missing], inverse)
+            }
+            if skill_ids is not None:
+                frame['matched_skill_ids'] = _expand([skill_ids[cols] for cols in matched], inverse)
+                frame['missing_skill_ids'] = _expand([skill_ids[cols] for cols in missing], inverse)
+            frames.append(pd.DataFrame(frame))
+        if verbose:
+            print(f"Processed {min(start + chunk_size, len(employee_ids))}/{len(employee_ids)} employees...")
+    if not frames:
+        columns = ['employee_id', 'role_id', 'match_score', 'matched_skills', 'missing_skills']
+        if skill_ids is not None:
+            columns += ['matched_skill_ids', 'missing_skill_ids']
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,626 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import time
+from collections import deque
+from urllib.parse import urlsplit
+import numpy as np
+import pandas as pd
+
+from artifacts import read_table, with_skill_strings, dataset_version
+from batch_scoring import BatchScorer, RESULT_COLUMNS as ROSTER_COLUMNS
+from incremental import MANIFEST_PATH
+from learning_paths import LearningPathStore, INDEX_FILE
+from lookup import DatasetLookup
+from role_index import build_role_index
+from scoring import SCORING_MODES, split_skill_columns, split_skill_strings
+
+# =========================
+# Local recommendation service
+# =========================
+# One long-lived process loads the generated tables, the lookup indexes and
+# the role index once, and answers JSON queries over HTTP (stdlib asyncio,
+# keep-alive connections). Every dashboard session can then share one warm
+# copy of the data instead of building its own:
+#
+#   POST /top_roles      {"employee_id": "E1", "k": 5}            precomputed Recommendations
+#                        {"skills": ["SQL", ...], "k": 5, "scoring": "idf"}   scored on demand
+#   POST /skill_gap      {"employee_id": "E1", "role_id": "R7"}
+#                        {"skills": ["SQL", ...], "role_id": "R7"}
+#   POST /learning_path  {"employee_id": "E1", "role_id": "R7"}   (role_id optional)
+#                        {"skills": ["SQL", ...], "k": 5}         paths to the top-k roles
+#   POST /score_roster   {"employee_ids": [...], "skills": ["SQL, Python", ...], "k": 5}
+#                        roster rows scored like batch_scoring.py (the app sends
+#                        SERVICE_ROSTER_ROWS rows per request)
+#   GET  /health         dataset version and sizes
+#   GET  /stats          p50 / p99 latency per route, batch sizes
+#
+# Skill-set queries that arrive together are scored as one batch (one pass
+# over their posting lists, see RoleIndex.top_roles_batch): the first query of a batch waits
+# at most BATCH_WAIT_MS for up to BATCH_MAX_QUERIES others.
+#
+#   python service.py serve --port 8765          (in the dataset directory)
+#   RECOMMENDATION_SERVICE_URL=http://127.0.0.1:8765 streamlit run app.py
+#   python service.py loadtest --concurrency 32 --requests 2000
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_URL_ENV = "RECOMMENDATION_SERVICE_URL"
+TABLES = ["Employees", "Roles", "Recommendations", "EmployeeSkills", "Skills"]
+
+BATCH_MAX_QUERIES = 64
+BATCH_WAIT_MS = 2
+MAX_REQUEST_BYTES = 1 << 20
+MAX_K = 100
+SERVICE_ROSTER_ROWS = 2_000
+LATENCY_WINDOW = 10_000
+
+RESULT_COLUMNS = ['role_id', 'match_score', 'matched_skills', 'missing_skills']
+
+
+class RequestTooLarge(ValueError):
+    # Request body over MAX_REQUEST_BYTES (answered with 413)
+    pass
+
+
+class ServiceError(Exception):
+    # Raised by the client for an error response; status is the HTTP code
+    def __init__(self, status, message):
+        super().__init__(f"❌ Recommendation service error {status}: {message}")
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _records(df):
+    return df[RESULT_COLUMNS].to_dict(orient="records")
+
+
+# =========================
+# Shared state (loaded once per process)
+# =========================
+class ServiceState:
+    def __init__(self, directory="."):
+        self.directory = directory
+        self.version = dataset_version(TABLES, directory)
+        employees, roles, recommendations, employee_skills, skills = (
+            read_table(name, directory=directory) for name in TABLES
+        )
+        self.lookup = DatasetLookup(employees, roles, recommendations, employee_skills, skills)
+        self.generated_scoring = "count"
+        try:
+            with open(os.path.join(directory, MANIFEST_PATH)) as f:
+                self.generated_scoring = json.load(f)['config'].get('scoring', "count")
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+        # On-demand scoring needs the source job_skills.csv, learning paths
+        # their index; either is disabled without its files
+        job_skills_path = os.path.join(directory, "job_skills.csv")
+        self.role_index = build_role_index(roles, skills, job_skills_path) if os.path.exists(job_skills_path) else None
+        self.role_pos = {r: i for i, r in enumerate(self.role_index.role_ids)} if self.role_index is not None else {}
+        has_paths = os.path.exists(os.path.join(directory, INDEX_FILE))
+        self.learning_paths = LearningPathStore(directory, skills) if has_paths else None
+        self.batch_scorers = {}
+
+    def health(self):
+        return {
+            'version': self.version,
+            'employees': len(self.lookup.employee_pos),
+            'roles': len(self.lookup.role_names),
+            'scoring': self.generated_scoring,
+            'on_demand_scoring': self.role_index is not None,
+            'learning_paths': self.learning_paths is not None,
+        }
+
+    def _check_employee(self, employee_id):
+        if employee_id not in self.lookup.employee_pos:
+            raise LookupError(f"Unknown employee_id '{employee_id}'")
+
+    def employee_top_roles(self, employee_id, k=5):
+        self._check_employee(employee_id)
+        recs = with_skill_strings(self.lookup.top_recommendations(employee_id, k), self.lookup.vocabulary)
+        return _records(recs)
+
+    def _check_role_index(self):
+        if self.role_index is None:
+            raise LookupError("On-demand scoring is disabled (job_skills.csv not found)")
+
+    def _role_row(self, role_id):
+        self._check_role_index()
+        if role_id not in self.role_pos:
+            raise LookupError(f"Unknown role_id '{role_id}'")
+        return self.role_pos[role_id]
+
+    def skill_ids(self, skills):
+        self._check_role_index()
+        return self.role_index.skill_ids_for_names(skills)
+
+    def employee_skill_ids(self, employee_id):
+        self._check_employee(employee_id)
+        start, end = self.lookup.emp_skill_offsets.get(employee_id, (0, 0))
+        return self.lookup.emp_skill_ids[start:end]
+
+    def skill_gap(self, role_id, employee_id=None, skill_ids=None):
+        # Matched / missing skills of any role, not only the recommended ones,
+        # for an employee or for a skill set
+        if employee_id is not None:
+            skill_ids = self.employee_skill_ids(employee_id)
+        row = self._role_row(role_id)
+        matched, missing = split_skill_strings(self.role_index.skill_mask(skill_ids), self.role_index.role_matrix,
+                                               self.role_index.skill_names, np.array([row]))
+        gap = {'employee_id': employee_id} if employee_id is not None else {}
+        return {
+            **gap,
+            'role_id': role_id,
+            'role_name': self.lookup.role_name(role_id),
+            'matched_skills': matched[0],
+            'missing_skills': missing[0],
+        }
+
+    def score_roster(self, employee_ids, skills, k=5, scoring="count"):
+        # Top-k roles of every roster row, with one BatchScorer per (scoring, k)
+        self._check_role_index()
+        if len(employee_ids) != len(skills):
+            raise ValueError("'employee_ids' and 'skills' must have the same length")
+        if (scoring, k) not in self.batch_scorers:
+            self.batch_scorers[(scoring, k)] = BatchScorer(self.role_index, scoring, top_k=k)
+        roster = pd.DataFrame({
+            'employee_id': [str(e) for e in employee_ids],
+            'skills': ["" if s is None else str(s) for s in skills],
+        })
+        return self.batch_scorers[(scoring, k)].score(roster).to_dict(orient="records")
+
+    def learning_path(self, employee_id=None, role_id=None, skill_ids=None, k=5):
+        if self.learning_paths is None:
+            raise LookupError("Learning paths not found (LearningPaths.index.json missing)")
+        if employee_id is not None:
+            self._check_employee(employee_id)
+            return self.learning_paths.expand(employee_id, role_id)
+        # A skill set has no stored paths: they are built from the missing
+        # skills of its top-k roles (or of role_id), scored on demand
+        if role_id is not None:
+            roles = np.array([self._role_row(role_id)])
+            scores = self.role_index.role_scores(skill_ids, roles, self.generated_scoring)
+        else:
+            self._check_role_index()
+            roles, scores = self.role_index.top_role_indices(skill_ids, k, self.generated_scoring)
+        _, missing = split_skill_columns(self.role_index.skill_mask(skill_ids), self.role_index.role_matrix, roles)
+        return [
+            {
+                'role_id': self.role_index.role_ids[row],
+                'match_score': score,
+                'learning_path': self.learning_paths.resources_for(self.role_index.vocabulary.ids[cols]),
+            }
+            for row, score, cols in zip(roles, scores, missing)
+        ]
+
+
+# =========================
+# Request batching for skill-set queries
+# =========================
+class QueryBatcher:
+    def __init__(self, state, max_queries=BATCH_MAX_QUERIES, wait_ms=BATCH_WAIT_MS):
+        self.state = state
+        self.max_queries = max_queries
+        self.wait = wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+
+    async def top_roles(self, skill_ids, k, scoring):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((skill_ids, k, scoring, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.wait
+            while len(batch) < self.max_queries:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batch_sizes.append(len(batch))
+            # One scoring call per mode; scored off the event loop so other
+            # requests keep being read meanwhile
+            for scoring in {query[2] for query in batch}:
+                queries = [query for query in batch if query[2] == scoring]
+                k = max(query[1] for query in queries)
+                try:
+                    frames = await loop.run_in_executor(
+                        None, self.state.role_index.top_roles_batch, [query[0] for query in queries], k, scoring
+                    )
+                except Exception as exc:
+                    for query in queries:
+                        if not query[3].done():
+                            query[3].set_exception(exc)
+                    continue
+                for (_, query_k, _, future), frame in zip(queries, frames):
+                    if not future.done():
+                        future.set_result(_records(frame.head(query_k)))
+
+
+class LatencyStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.seconds = {}
+
+    def add(self, route, seconds):
+        self.seconds.setdefault(route, deque(maxlen=self.window)).append(seconds)
+
+    def summary(self):
+        return {
+            route: {
+                'requests': len(values),
+                'p50_ms': round(1000 * float(np.percentile(values, 50)), 3),
+                'p99_ms': round(1000 * float(np.percentile(values, 99)), 3),
+            }
+            for route, values in self.seconds.items()
+        }
+
+
+# =========================
+# HTTP server
+# =========================
+class RecommendationService:
+    def __init__(self, state):
+        self.state = state
+        self.batcher = QueryBatcher(state)
+        self.stats = LatencyStats()
+
+    def _query(self, body):
+        # (employee_id, None) or (None, skill ids) of a request body
+        if 'employee_id' in body:
+            return str(body['employee_id']), None
+        for field in ('skill_ids', 'skills'):
+            if field in body and not isinstance(body[field], list):
+                raise ValueError(f"'{field}' must be a list")
+        if 'skill_ids' in body:
+            return None, [int(s) for s in body['skill_ids']]
+        if 'skills' in body:
+            return None, self.state.skill_ids([str(s) for s in body['skills']])
+        raise ValueError("Expected 'employee_id', 'skills' or 'skill_ids'")
+
+    def _k(self, body):
+        # Number of roles asked for: at least 1, capped at MAX_K
+        k = int(body.get('k', 5))
+        if k < 1:
+            raise ValueError(f"'k' must be at least 1, got {k}")
+        return min(k, MAX_K)
+
+    def _scoring(self, body):
+        scoring = body.get('scoring') or self.state.generated_scoring
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring '{scoring}', expected one of {SCORING_MODES}")
+        return scoring
+
+    async def top_roles(self, body):
+        k = self._k(body)
+        employee_id, skill_ids = self._query(body)
+        if employee_id is not None:
+            return self.state.employee_top_roles(employee_id, k)
+        scoring = self._scoring(body)
+        if self.state.role_index is None:
+            raise LookupError("On-demand scoring is disabled (job_skills.csv not found)")
+        return await self.batcher.top_roles(skill_ids, k, scoring)
+
+    async def score_roster(self, body):
+        for field in ('employee_ids', 'skills'):
+            if not isinstance(body[field], list):
+                raise ValueError(f"'{field}' must be a list")
+        # Scored off the event loop, like the batched skill-set queries
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.state.score_roster, body['employee_ids'], body['skills'], self._k(body), self._scoring(body)
+        )
+
+    async def dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return self.state.health()
+        if method == "GET" and path == "/stats":
+            sizes = self.batcher.batch_sizes
+            return {'routes': self.stats.summary(),
+                    'batches': len(sizes), 'mean_batch_size': round(float(np.mean(sizes)), 2) if sizes else 0.0}
+        if method == "POST" and path == "/top_roles":
+            return await self.top_roles(body)
+        if method == "POST" and path == "/skill_gap":
+            employee_id, skill_ids = self._query(body)
+            return self.state.skill_gap(str(body['role_id']), employee_id, skill_ids)
+        if method == "POST" and path == "/learning_path":
+            employee_id, skill_ids = self._query(body)
+            role_id = body.get('role_id')
+            return self.state.learning_path(employee_id, str(role_id) if role_id is not None else None,
+                                            skill_ids, self._k(body))
+        if method == "POST" and path == "/score_roster":
+            return await self.score_roster(body)
+        raise FileNotFoundError(f"No route {method} {path}")
+
+    async def respond(self, method, path, payload):
+        try:
+            body = json.loads(payload) if payload else {}
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            return 200, await self.dispatch(method, path, body)
+        except FileNotFoundError as exc:
+            return 404, {'error': str(exc)}
+        except LookupError as exc:
+            # KeyError (missing field) is a LookupError too, but a bad request
+            return (400 if isinstance(exc, KeyError) else 404), {'error': str(exc)}
+        except (ValueError, TypeError) as exc:
+            return 400, {'error': str(exc)}
+
+    async def handle(self, reader, writer):
+        # One keep-alive connection: requests are answered in order
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except RequestTooLarge as exc:
+                    # The body is left unread: answer and drop the connection
+                    _write_response(writer, 413, {'error': str(exc)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                except ValueError as exc:
+                    # Malformed request line or header: answer and drop the connection
+                    _write_response(writer, 400, {'error': f"Malformed request: {exc}"}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, payload = request
+                start = time.perf_counter()
+                status, result = await self.respond(method, path, payload)
+                _write_response(writer, status, result, keep_alive=headers.get("connection") != "close")
+                await writer.drain()
+                self.stats.add(path, time.perf_counter() - start)
+                if headers.get("connection") == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        batcher = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"✅ Recommendation service listening on http://{host}:{port} "
+              f"({self.state.health()['employees']} employees, {self.state.health()['roles']} roles)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+async def _read_request(reader):
+    # (method, path, headers, body) of one HTTP/1.1 request, None at EOF
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length < 0:
+        raise ValueError(f"negative Content-Length {length}")
+    if length > MAX_REQUEST_BYTES:
+        raise RequestTooLarge(f"Request body of {length} bytes is over the {MAX_REQUEST_BYTES} byte limit")
+    payload = await reader.readexactly(length) if length else b""
+    return method, path, headers, payload
+
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}
+
+
+def _write_response(writer, status, result, keep_alive=True):
+    body = json.dumps(result, default=_json_default).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+    )
+
+
+# =========================
+# Client (used by app.py)
+# =========================
+class RecommendationClient:
+    def __init__(self, url, timeout=10):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def _request(self, method, path, payload, headers):
+        self.connection.request(method, path, payload, headers)
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def _call(self, method, path, body=None):
+        # Raises OSError when the service cannot be reached, ServiceError for
+        # an error response
+        payload = json.dumps(body, default=_json_default) if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        try:
+            response, data = self._request(method, path, payload, headers)
+        except (OSError, http.client.HTTPException):
+            # Stale keep-alive connection (e.g. the service restarted): retry once
+            self.connection.close()
+            try:
+                response, data = self._request(method, path, payload, headers)
+            except http.client.HTTPException as exc:
+                self.connection.close()
+                raise ConnectionError(f"❌ Recommendation service unreachable: {exc!r}") from exc
+        result = json.loads(data)
+        if response.status != 200:
+            raise ServiceError(response.status, result.get('error'))
+        return result
+
+    def health(self):
+        return self._call("GET", "/health")
+
+    def stats(self):
+        return self._call("GET", "/stats")
+
+    def top_roles(self, employee_id=None, skills=None, skill_ids=None, k=5, scoring=None):
+        # Same columns as RoleIndex.top_roles: an employee's precomputed
+        # recommendations, or a skill set (names or ids) scored on demand
+        body = {**self._query(employee_id, skills, skill_ids), 'k': k}
+        if employee_id is None:
+            body['scoring'] = scoring
+        return pd.DataFrame(self._call("POST", "/top_roles", body), columns=RESULT_COLUMNS)
+
+    @staticmethod
+    def _query(employee_id=None, skills=None, skill_ids=None):
+        if employee_id is not None:
+            return {'employee_id': employee_id}
+        if skill_ids is not None:
+            return {'skill_ids': list(skill_ids)}
+        return {'skills': list(skills or [])}
+
+    def skill_gap(self, employee_id=None, role_id=None, skills=None, skill_ids=None):
+        # An employee's (or a skill set's) matched / missing skills for role_id
+        body = {**self._query(employee_id, skills, skill_ids), 'role_id': role_id}
+        return self._call("POST", "/skill_gap", body)
+
+    def learning_path(self, employee_id=None, role_id=None, skills=None, skill_ids=None, k=5):
+        body = {**self._query(employee_id, skills, skill_ids), 'role_id': role_id, 'k': k}
+        return self._call("POST", "/learning_path", body)
+
+    def score_roster(self, roster_chunk, scoring=None, k=5):
+        # Top-k roles of each (employee_id, skills) row, same columns as BatchScorer.score
+        body = {
+            'employee_ids': roster_chunk['employee_id'].astype(str).tolist(),
+            'skills': roster_chunk['skills'].fillna("").astype(str).tolist(),
+            'k': k,
+            'scoring': scoring,
+        }
+        return pd.DataFrame(self._call("POST", "/score_roster", body), columns=ROSTER_COLUMNS)
+
+
+class RemoteBatchScorer:
+    # BatchScorer stand-in for score_roster_csv: roster chunks are scored by the service
+    def __init__(self, client, scoring=None, top_k=5):
+        self.client = client
+        self.scoring = scoring
+        self.top_k = top_k
+
+    def iter_scores(self, roster_chunks):
+        for roster_chunk in roster_chunks:
+            yield self.client.score_roster(roster_chunk, self.scoring, self.top_k)
+
+
+# =========================
+# Load test: p50 / p99 latency under concurrent clients
+# =========================
+async def _post(reader, writer, host, path, body):
+    payload = json.dumps(body).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(status_line.split()[1])
+
+
+async def load_test(url, queries, concurrency=32):
+    # queries: list of (path, body); each of `concurrency` connections sends
+    # its share back to back. Returns per-request latencies (s) and the wall time.
+    parts = urlsplit(url)
+    latencies, errors = [], 0
+
+    async def worker(share):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+        for path, body in share:
+            start = time.perf_counter()
+            if await _post(reader, writer, parts.hostname, path, body) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(queries[i::concurrency]) for i in range(concurrency)))
+    return np.array(latencies), time.perf_counter() - start, errors
+
+
+def _sample_queries(directory, n_requests, kind, seed=42):
+    # Random employees, or their skill sets as on-demand queries
+    rng = np.random.default_rng(seed)
+    employee_skills = read_table("EmployeeSkills", directory=directory)
+    employee_skills['employee_id'] = employee_skills['employee_id'].astype(str)
+    names = read_table("Skills", directory=directory).drop_duplicates('skill_id').set_index('skill_id')['skill_name']
+    skill_sets = employee_skills.groupby('employee_id', sort=False)['skill_id'].agg(list)
+    picks = rng.integers(0, len(skill_sets), n_requests)
+    queries = []
+    for i, pick in enumerate(picks):
+        employee_id = skill_sets.index[pick]
+        if kind == "employee" or (kind == "mixed" and i % 2):
+            queries.append(("/top_roles", {'employee_id': employee_id, 'k': 5}))
+        else:
+            skills = [names[s] for s in skill_sets.iloc[pick] if s in names.index]
+            queries.append(("/top_roles", {'skills': skills, 'k': 5}))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local recommendation service shared by dashboard sessions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="load the dataset once and answer queries")
+    serve.add_argument("--host", default=SERVICE_HOST)
+    serve.add_argument("--port", type=int, default=SERVICE_PORT)
+    serve.add_argument("--data-dir", default=".", help="directory with the generated tables")
+    load = commands.add_parser("loadtest", help="p50 / p99 latency of a running service under concurrent load")
+    load.add_argument("--url", default=os.environ.get(SERVICE_URL_ENV, f"http://{SERVICE_HOST}:{SERVICE_PORT}"))
+    load.add_argument("--data-dir", default=".", help="dataset the queries are sampled from")
+    load.add_argument("--requests", type=int, default=2000)
+    load.add_argument("--concurrency", type=int, default=32)
+    load.add_argument("--kind", default="mixed", choices=["employee", "skills", "mixed"])
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        start = time.perf_counter()
+        state = ServiceState(args.data_dir)
+        print(f"✅ Dataset loaded ({time.perf_counter() - start:.1f}s)")
+        try:
+            asyncio.run(RecommendationService(state).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    queries = _sample_queries(args.data_dir, args.requests, args.kind)
+    latencies, seconds, errors = asyncio.run(load_test(args.url, queries, args.concurrency))
+    print(f"{len(latencies)} requests ({args.kind}), {args.concurrency} connections, {errors} errors: "
+          f"{len(latencies) / seconds:.0f} req/s, p50 {1000 * np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {1000 * np.percentile(latencies, 99):.2f} ms")
+    print("Server side:", json.dumps(RecommendationClient(args.url).stats()))
+
+
+if __name__ == "__main__":
+    main()
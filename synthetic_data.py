@@ -0,0 +1,127 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# =========================
+# Synthetic source data for benchmarks
+# =========================
+# Writes HR_Analytics.csv, job_postings.csv and job_skills.csv with the
+# columns genratedata.py reads, at any size, so the pipeline and the app can
+# be timed without the real exports. Skill popularity follows a Zipf-like
+# curve (a few skills appear in most postings, most skills are rare), which
+# is what makes the role matrix and the posting lists skewed in real data.
+#
+#   python synthetic_data.py --employees 5000 --roles 100000 --out bench_data
+
+# Always part of the vocabulary; genratedata.py and learning_paths.py refer to them
+COMMON_SKILLS = ["Python", "SQL", "Machine Learning", "Excel", "Tableau"]
+JOB_TITLES = ["Data Analyst", "Data Scientist", "Software Engineer", "Product Manager",
+              "Business Analyst", "DevOps Engineer", "Sales Executive", "HR Specialist"]
+JOB_ROLES = ["Sales Executive", "Research Scientist", "Laboratory Technician", "Manager",
+             "Healthcare Representative", "Human Resources", "Research Director"]
+
+# Rows generated (and written) per batch, to bound memory for large sizes
+WRITE_BATCH_ROWS = 100_000
+
+
+def skill_vocabulary(vocab_size):
+    names = COMMON_SKILLS[:vocab_size]
+    names += [f"Skill {i}" for i in range(vocab_size - len(names))]
+    return np.array(names, dtype=object)
+
+
+def skill_popularity(vocab_size, skew=1.1):
+    weights = 1.0 / np.arange(1, vocab_size + 1) ** skew
+    return weights / weights.sum()
+
+
+def _append_csv(df, path, first):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+
+def write_hr_analytics(path, n_employees, rng):
+    for lo in range(0, max(n_employees, 1), WRITE_BATCH_ROWS):
+        hi = min(lo + WRITE_BATCH_ROWS, n_employees)
+        _append_csv(pd.DataFrame({
+            'EmpID': [f"RM{i}" for i in range(lo, hi)],
+            'Age': rng.integers(21, 60, hi - lo),
+            'JobRole': rng.choice(JOB_ROLES, hi - lo),
+        }), path, lo == 0)
+
+
+def repost_sources(n_rows, duplicate_rate, rng):
+    # Row each posting copies its title and skills from: itself, or (with
+    # probability duplicate_rate) an earlier posting of the same batch, the
+    # way job boards list the same role under several links
+    source = np.arange(n_rows)
+    repost = np.flatnonzero(rng.random(n_rows) < duplicate_rate)
+    repost = repost[repost > 0]
+    source[repost] = (rng.random(len(repost)) * repost).astype(np.int64)
+    for i in repost:
+        source[i] = source[source[i]]
+    return source
+
+
+def write_job_files(postings_path, skills_path, n_roles, skills_per_role, vocab_size, rng, duplicate_rate=0.0):
+    names = skill_vocabulary(vocab_size)
+    popularity = skill_popularity(len(names))
+    for lo in range(0, max(n_roles, 1), WRITE_BATCH_ROWS):
+        hi = min(lo + WRITE_BATCH_ROWS, n_roles)
+        links = [f"https://www.linkedin.com/jobs/view/synthetic-{i}" for i in range(lo, hi)]
+        titles = rng.choice(JOB_TITLES, hi - lo)
+
+        # Skills per posting ~ Poisson(skills_per_role), at least 1
+        lengths = np.maximum(rng.poisson(skills_per_role, hi - lo), 1)
+        flat = names[rng.choice(len(names), lengths.sum(), p=popularity)]
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        skill_lists = np.array([", ".join(flat[a:b]) for a, b in zip(bounds[:-1], bounds[1:])], dtype=object)
+        if duplicate_rate > 0:
+            source = repost_sources(hi - lo, duplicate_rate, rng)
+            titles, skill_lists = titles[source], skill_lists[source]
+
+        _append_csv(pd.DataFrame({
+            'job_link': links,
+            'job_title': titles,
+            'company': "Synthetic Corp",
+        }), postings_path, lo == 0)
+        _append_csv(pd.DataFrame({
+            'job_link': links,
+            'job_skills': skill_lists,
+        }), skills_path, lo == 0)
+
+
+def write_source_csvs(directory, n_employees=200, n_roles=10_000, skills_per_role=12, vocab_size=5_000, seed=42,
+                      duplicate_rate=0.0):
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    write_hr_analytics(os.path.join(directory, "HR_Analytics.csv"), n_employees, rng)
+    write_job_files(
+        os.path.join(directory, "job_postings.csv"),
+        os.path.join(directory, "job_skills.csv"),
+        n_roles, skills_per_role, vocab_size, rng, duplicate_rate
+    )
+
+
+def add_size_arguments(parser):
+    parser.add_argument("--employees", type=int, default=200, help="rows in HR_Analytics.csv")
+    parser.add_argument("--roles", type=int, default=10_000, help="postings in job_postings.csv / job_skills.csv")
+    parser.add_argument("--skills-per-role", type=float, default=12, help="mean skills listed per posting")
+    parser.add_argument("--vocab-size", type=int, default=5_000, help="distinct skill names")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0,
+                        help="share of postings that repost an earlier posting's title and skills")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic HR_Analytics / job_postings / job_skills CSVs.")
+    parser.add_argument("--out", default="synthetic_data", help="output directory")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+    write_source_csvs(args.out, args.employees, args.roles, args.skills_per_role, args.vocab_size, args.seed,
+                      args.duplicate_rate)
+    print(f"✅ Synthetic source CSVs written to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pdfplumber
+
+# =========================
+# Upload parsing for the dashboard
+# =========================
+# Uploaded CSV / PDF files are parsed once per distinct content: results are
+# kept in an UploadCache keyed by the SHA-256 of the file bytes, so widget
+# changes (every Streamlit rerun) never reparse the same file. PDF pages are
+# extracted in batches on a process pool, in page order, and reported through
+# an on_page callback so the app can show text and tables as they arrive.
+
+MAX_UPLOAD_MB = 25
+MAX_PDF_PAGES = 200
+
+# Pages per pool task; PDFs with a single batch are parsed in-process
+PAGES_PER_TASK = 8
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+UPLOAD_CACHE_ENTRIES = 16
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def check_upload_size(data, max_mb=MAX_UPLOAD_MB):
+    size_mb = len(data) / (1024 * 1024)
+    if size_mb > max_mb:
+        raise ValueError(f"❌ Upload is {size_mb:.1f} MB, the limit is {max_mb} MB")
+
+
+class ParsedUpload:
+    def __init__(self, name, digest, size, n_pages=0):
+        self.name = name
+        self.digest = digest
+        self.size = size
+        self.n_pages = n_pages
+        self.pages_read = 0
+        self.text = ""
+        # One entry per page table found (rows as lists, header first)
+        self.tables = []
+        # CSV uploads: the parsed frame
+        self.frame = None
+
+    @property
+    def truncated(self):
+        return self.pages_read < self.n_pages
+
+    def first_table(self):
+        if not self.tables:
+            return None
+        return pd.DataFrame(self.tables[0][1:], columns=self.tables[0][0])
+
+
+class UploadCache:
+    # Small LRU of ParsedUpload by content hash, shared by all sessions
+    def __init__(self, max_entries=UPLOAD_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            parsed = self._entries.get(digest)
+            if parsed is not None:
+                self._entries.move_to_end(digest)
+            return parsed
+
+    def put(self, parsed):
+        with self._lock:
+            self._entries[parsed.digest] = parsed
+            self._entries.move_to_end(parsed.digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def parse_csv(name, data):
+    check_upload_size(data)
+    parsed = ParsedUpload(name, content_hash(data), len(data))
+    parsed.frame = pd.read_csv(io.BytesIO(data))
+    # Cell values are the upload's text (used for skill matching); empty
+    # cells stay NaN under a string dtype, so they are blanked first
+    parsed.text = "\n".join(parsed.frame.fillna("").astype(str).agg(" ".join, axis=1))
+    return parsed
+
+
+# =========================
+# PDF pages on a process pool
+# =========================
+_pdf_data = None
+
+
+def _init_pdf_worker(data):
+    # The file bytes are sent once per worker, not once per batch
+    global _pdf_data
+    _pdf_data = data
+
+
+def _extract_pages(lo, hi, data=None):
+    # [(page_no, text, first table or None)] for pages lo..hi-1
+    pages = []
+    with pdfplumber.open(io.BytesIO(_pdf_data if data is None else data)) as pdf:
+        for page_no in range(lo, hi):
+            page = pdf.pages[page_no]
+            pages.append((page_no, page.extract_text() or "", page.extract_table()))
+            page.close()
+    return pages
+
+
+def count_pages(data):
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pdf_pages(data, n_pages, workers=PDF_WORKERS):
+    # Yields (page_no, text, table) for pages 0..n_pages-1 in order, as soon
+    # as each batch is done
+    batches = [(lo, min(lo + PAGES_PER_TASK, n_pages)) for lo in range(0, n_pages, PAGES_PER_TASK)]
+    if workers <= 1 or len(batches) <= 1:
+        for lo, hi in batches:
+            yield from _extract_pages(lo, hi, data)
+        return
+    # Spawned, not forked: the Streamlit server is multithreaded, and a forked
+    # child can deadlock on a lock another thread held at fork time
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches)), initializer=_init_pdf_worker,
+                             initargs=(data,), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_extract_pages, lo, hi) for lo, hi in batches]
+        for future in futures:
+            yield from future.result()
+
+
+def parse_pdf(name, data, max_pages=MAX_PDF_PAGES, workers=PDF_WORKERS, on_page=None):
+    # on_page(parsed, page_text, table) is called after every page, in order
+    check_upload_size(data)
+    parsed = ParsedUpload(name, content_hash(data), len(data), count_pages(data))
+    texts = []
+    for _, text, table in iter_pdf_pages(data, min(parsed.n_pages, max_pages), workers):
+        texts.append(text + "\n")
+        if table:
+            parsed.tables.append(table)
+        parsed.pages_read += 1
+        if on_page is not None:
+            on_page(parsed, text, table)
+    parsed.text = "".join(texts)
+    return parsed
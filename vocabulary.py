@@ -0,0 +1,100 @@
+import re
+import numpy as np
+import pandas as pd
+
+# =========================
+# Skill tokenizer + vocabulary shared by every stage
+# =========================
+# Skill lists arrive as comma-separated strings: "," in job_skills.csv and
+# ", " in the matched_skills / missing_skills columns. They are split once
+# with vectorized str.split + explode, interned to integer skill_ids, and
+# handed between stages as int arrays; names are only joined back into
+# strings for the CSV output and for display.
+
+SOURCE_SEPARATOR = ","
+LIST_SEPARATOR = ", "
+
+# Words of a skill name or of free text ("Node.js", "C++" and "CI/CD" stay
+# one word; trailing punctuation is dropped)
+WORD_PATTERN = re.compile(r"[a-z0-9+#]+(?:[./-][a-z0-9+#]+)*")
+
+
+def tokenize(skill_strings, sep=SOURCE_SEPARATOR):
+    # Series of skill-list strings -> one stripped, non-empty name per row,
+    # indexed by the position of the string it came from
+    skill_strings = pd.Series(skill_strings).reset_index(drop=True)
+    tokens = skill_strings.dropna().astype(str).str.split(sep).explode().str.strip()
+    return tokens[tokens.notna() & (tokens != "")]
+
+
+def words(text):
+    return WORD_PATTERN.findall(str(text).lower())
+
+
+def group_by_row(values, row_positions, n_rows):
+    # Split a flat array back into one array per source row; row_positions
+    # must be non-decreasing (as produced by explode)
+    counts = np.bincount(np.asarray(row_positions, dtype=np.int64), minlength=n_rows)
+    return np.split(np.asarray(values), np.cumsum(counts)[:-1])
+
+
+class SkillVocabulary:
+    def __init__(self, skill_names, skill_ids=None):
+        # skill_ids default to position + 1, as in Skills.csv
+        self.names = np.asarray(skill_names, dtype=object).astype(str)
+        if skill_ids is None:
+            skill_ids = np.arange(1, len(self.names) + 1)
+        self.ids = np.asarray(skill_ids, dtype=np.int64)
+        self.name_to_id = dict(zip(self.names, self.ids))
+        self.id_to_name = dict(zip(self.ids, self.names))
+        # Column j of the scoring matrices is skill j of the vocabulary
+        self.id_to_col = {sid: j for j, sid in enumerate(self.ids)}
+        # Built on first use by ids_in_text()
+        self._phrases = None
+
+    @classmethod
+    def from_frame(cls, skills_df):
+        return cls(skills_df['skill_name'].to_numpy(), skills_df['skill_id'].to_numpy())
+
+    def to_frame(self):
+        return pd.DataFrame({'skill_id': self.ids, 'skill_name': self.names})
+
+    def __len__(self):
+        return len(self.names)
+
+    def ids_for_names(self, skill_names):
+        # Unknown names are dropped
+        return [self.name_to_id[name] for name in skill_names if name in self.name_to_id]
+
+    def encode(self, skill_strings, sep=LIST_SEPARATOR):
+        # "SQL, Python" -> array([12, 7]) per row; unknown names are dropped
+        skill_strings = pd.Series(skill_strings)
+        tokens = tokenize(skill_strings, sep)
+        ids = tokens.map(self.name_to_id)
+        ids = ids[ids.notna()]
+        return group_by_row(ids.to_numpy(dtype=np.int32), ids.index, len(skill_strings))
+
+    def ids_in_text(self, text):
+        # Skill ids whose names appear in free text (resumes, uploaded files)
+        # as whole words, case-insensitive, in order of first mention
+        if self._phrases is None:
+            self._phrases = {}
+            for name, sid in zip(self.names, self.ids):
+                self._phrases.setdefault(tuple(words(name)), sid)
+            self._phrases.pop((), None)
+            self._max_words = max(map(len, self._phrases), default=0)
+        text_words = words(text)
+        found = {}
+        for i in range(len(text_words)):
+            for n in range(1, min(self._max_words, len(text_words) - i) + 1):
+                sid = self._phrases.get(tuple(text_words[i:i + n]))
+                if sid is not None:
+                    found.setdefault(sid, None)
+        return list(found)
+
+    def decode(self, skill_id_lists, sep=LIST_SEPARATOR):
+        # Inverse of encode(); missing lists become ""
+        return [
+            sep.join(self.id_to_name[s] for s in ids) if ids is not None else ""
+            for ids in skill_id_lists
+        ]